@@ -0,0 +1,5 @@
+from app.core.breeds import BreedRegistry, breed_registry
+
+
+def get_breed_registry() -> BreedRegistry:
+    return breed_registry
@@ -0,0 +1,5 @@
+from app.core.cache import ResponseCache, response_cache
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
@@ -0,0 +1,5 @@
+from app.core.events import EventBroker, mission_events
+
+
+def get_mission_events() -> EventBroker:
+    return mission_events
@@ -1,16 +1,48 @@
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.api.dependencies.session import get_async_session
+from app.api.dependencies.breeds import get_breed_registry
+from app.api.dependencies.cache import get_response_cache
+from app.api.dependencies.session import get_async_session, get_session_maker
+from app.core.breeds import BreedRegistry
+from app.core.cache import ResponseCache
 from app.services.cats import CatService
+from app.services.exports import ExportService
+from app.services.imports import ImportService
 from app.services.missions import MissionService
+from app.services.stats import StatsService
 
 
-def get_cats_service(session: AsyncSession = Depends(get_async_session)) -> CatService:
-    return CatService(session)
+def get_cats_service(
+    session: AsyncSession = Depends(get_async_session),
+    breed_registry: BreedRegistry = Depends(get_breed_registry),
+    cache: ResponseCache = Depends(get_response_cache),
+) -> CatService:
+    return CatService(session, breed_registry, cache)
+
+
+def get_import_service(
+    session: AsyncSession = Depends(get_async_session),
+    breed_registry: BreedRegistry = Depends(get_breed_registry),
+    cache: ResponseCache = Depends(get_response_cache),
+) -> ImportService:
+    return ImportService(session, breed_registry, cache)
 
 
 def get_missions_service(
     session: AsyncSession = Depends(get_async_session),
+    cache: ResponseCache = Depends(get_response_cache),
 ) -> MissionService:
-    return MissionService(session)
+    return MissionService(session, cache)
+
+
+def get_export_service(
+    session_maker: async_sessionmaker = Depends(get_session_maker),
+) -> ExportService:
+    return ExportService(session_maker)
+
+
+def get_stats_service(
+    session: AsyncSession = Depends(get_async_session),
+) -> StatsService:
+    return StatsService(session)
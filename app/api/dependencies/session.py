@@ -1,10 +1,45 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import async_session_maker
+from app.config.settings import settings
+from app.core.database import async_session_maker, replica_session_maker
 
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+# Read-your-writes escape hatches: an explicit header or the cookie set on writes
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+
+
+def uses_primary(request: Request) -> bool:
+    return (
+        request.method not in READ_ONLY_METHODS
+        or request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary"
+        or PRIMARY_PIN_COOKIE in request.cookies
+    )
+
+
+def get_session_maker(request: Request, response: Response) -> async_sessionmaker:
+    if not settings.POSTGRES_REPLICA_URL:
+        return async_session_maker
+
+    if request.method not in READ_ONLY_METHODS:
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            "1",
+            max_age=settings.DB_READ_YOUR_WRITES_WINDOW,
+            httponly=True,
+        )
+    return async_session_maker if uses_primary(request) else replica_session_maker
+
+
+async def get_async_session(
+    session_maker: async_sessionmaker = Depends(get_session_maker),
+) -> AsyncGenerator[AsyncSession, None]:
+    # No connection is checked out until the first statement, and services give
+    # it back once their unit of work is over: on commit, or BaseService.release()
+    # after a read. Requests served from the cache never touch the pool
+    async with session_maker() as session:
         yield session
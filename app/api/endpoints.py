@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
 from app.api.routes.cats import router as cats_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.missions import router as missions_router
+from app.api.routes.stats import router as stats_router
 
 router = APIRouter()
 
 router.include_router(cats_router)
 router.include_router(missions_router)
+router.include_router(stats_router)
+router.include_router(metrics_router)
@@ -0,0 +1,308 @@
+import re
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.logs.context import correlation_id
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.idempotency import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyMismatchError,
+    IdempotencyStore,
+    StoredResponse,
+    fingerprint,
+)
+from app.core.instrumentation import RequestStats, request_stats
+from app.core.metrics import metrics
+
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+CORRELATION_ID_HEADER = "X-Request-ID"
+# Incoming ids end up in every log line, so only short, plain ones are reused
+CORRELATION_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_PATTERN = re.compile(r"[\x21-\x7e]{1,255}")
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    labels=("method", "route", "status"),
+)
+request_db_seconds = metrics.histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements per request",
+    labels=("method", "route"),
+)
+request_statements = metrics.histogram(
+    "http_request_db_statements",
+    "SQL statements issued per request",
+    labels=("method", "route"),
+    buckets=STATEMENT_BUCKETS,
+)
+request_connection_seconds = metrics.histogram(
+    "http_request_connection_seconds",
+    "Time pool connections were held per request",
+    labels=("method", "route"),
+)
+idempotent_requests = metrics.counter(
+    "idempotent_requests_total",
+    "Requests made with an Idempotency-Key by outcome",
+    labels=("route", "result"),
+)
+statement_budget_exceeded = metrics.counter(
+    "http_request_statement_budget_exceeded_total",
+    "Requests that issued more statements than DB_STATEMENT_BUDGET",
+    labels=("method", "route"),
+)
+
+
+def route_label(scope: Scope) -> str:
+    # The route template keeps the label cardinality bounded, unlike the raw path
+    route = scope.get("route")
+    return getattr(route, "path", "<unmatched>")
+
+
+class InstrumentationMiddleware:
+    """Records SQL statements, DB time, rows and commits for every request.
+
+    The totals, along with pool checkouts and the time connections were held,
+    are sent back in a Server-Timing header, logged as structured fields and
+    aggregated into per-route histograms. Database work done while streaming a
+    response body, or connections returned after the response started, are not
+    part of the header, which is sent first.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", self.server_timing(stats)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            self.record(scope, stats, status_code)
+
+    @staticmethod
+    def server_timing(stats: RequestStats) -> str:
+        return ", ".join(
+            [
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} statements"',
+                f"pool;dur={stats.connection_time * 1000:.2f}"
+                f';desc="{stats.checkouts} checkouts"',
+                f"app;dur={stats.elapsed * 1000:.2f}",
+            ]
+        )
+
+    @staticmethod
+    def record(scope: Scope, stats: RequestStats, status_code: int) -> None:
+        method = scope["method"]
+        route = route_label(scope)
+        elapsed = stats.elapsed
+
+        request_duration.observe(
+            elapsed, method=method, route=route, status=str(status_code)
+        )
+        request_db_seconds.observe(stats.db_time, method=method, route=route)
+        request_statements.observe(stats.statements, method=method, route=route)
+        request_connection_seconds.observe(
+            stats.connection_time, method=method, route=route
+        )
+
+        logger.info(
+            f"{method} {route} {status_code} in {elapsed * 1000:.1f}ms"
+            f" ({stats.statements} statements, {stats.db_time * 1000:.1f}ms in DB)",
+            extra={
+                "http_method": method,
+                "http_route": route,
+                "http_status": status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "db_statements": stats.statements,
+                "db_time_ms": round(stats.db_time * 1000, 2),
+                "db_rows": stats.rows,
+                "db_commits": stats.commits,
+                "db_checkouts": stats.checkouts,
+                "db_connection_ms": round(stats.connection_time * 1000, 2),
+            },
+        )
+
+        budget = settings.DB_STATEMENT_BUDGET
+        if budget is not None and stats.statements > budget:
+            statement_budget_exceeded.inc(method=method, route=route)
+            logger.warning(
+                f"{method} {route} issued {stats.statements} SQL statements,"
+                f" over the budget of {budget} (possible N+1 query)"
+            )
+
+
+class CorrelationIdMiddleware:
+    """Tags every log record of a request with the caller's X-Request-ID, or a
+    generated one, and echoes it back in the response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(CORRELATION_ID_HEADER, "")
+        if not CORRELATION_ID_PATTERN.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[CORRELATION_ID_HEADER] = request_id
+            await send(message)
+
+        token = correlation_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            correlation_id.reset(token)
+
+
+class IdempotencyMiddleware:
+    """Makes the given (method, path) endpoints safe to retry with an
+    Idempotency-Key header.
+
+    The first request with a key executes and its response is stored along with
+    a fingerprint of the request. Retries replay the stored response without
+    reaching the route, duplicates sent while it still runs wait for it, and a
+    key reused for a different request is rejected. 5xx responses are not stored
+    so the request can be retried.
+    """
+
+    def __init__(
+        self, app: ASGIApp, store: IdempotencyStore, endpoints: set[tuple[str, str]]
+    ):
+        self.app = app
+        self.store = store
+        self.endpoints = endpoints
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or (scope["method"], scope["path"]) not in self.endpoints
+            or IDEMPOTENCY_KEY_HEADER.lower() not in Headers(scope=scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route = scope["path"]
+        key = Headers(scope=scope)[IDEMPOTENCY_KEY_HEADER]
+        if not IDEMPOTENCY_KEY_PATTERN.fullmatch(key):
+            idempotent_requests.inc(route=route, result="invalid")
+            response = JSONResponse(
+                {"detail": "Idempotency-Key must be 1-255 printable characters"},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        body, receive = await self.read_body(receive)
+        request_fingerprint = fingerprint(
+            scope["method"], scope["path"], scope["query_string"], body
+        )
+        try:
+            async with self.store.claim(key, request_fingerprint) as claim:
+                if claim.stored is not None:
+                    idempotent_requests.inc(route=route, result="replayed")
+                    logger.info("Replaying the response stored for an Idempotency-Key")
+                    await self.replay(claim.stored, send)
+                    return
+
+                idempotent_requests.inc(route=route, result="executed")
+                response = await self.run(scope, receive, send)
+                if response.status_code < 500:
+                    claim.save(response)
+        except IdempotencyKeyMismatchError:
+            idempotent_requests.inc(route=route, result="mismatch")
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request"},
+                status_code=422,
+            )
+            await response(scope, receive, send)
+        except IdempotencyKeyInProgressError:
+            idempotent_requests.inc(route=route, result="in_progress")
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+
+    @staticmethod
+    async def read_body(receive: Receive) -> tuple[bytes, Receive]:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        received = False
+
+        async def replay_body() -> Message:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay_body
+
+    async def run(self, scope: Scope, receive: Receive, send: Send) -> StoredResponse:
+        response = StoredResponse(status_code=500, headers=[], body=b"")
+        chunks = []
+
+        async def send_and_capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+        response.body = b"".join(chunks)
+        return response
+
+    @staticmethod
+    async def replay(response: StoredResponse, send: Send) -> None:
+        headers = [
+            *response.headers,
+            (IDEMPOTENT_REPLAYED_HEADER.lower().encode(), b"true"),
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": response.body})
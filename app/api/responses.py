@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class SchemaResponse(JSONResponse):
+    """JSON response serialized directly by pydantic-core.
+
+    Routes that return it skip FastAPI's response_model round trip (dump to a
+    dict, validate it again, serialize), so it must only carry schemas built
+    from trusted data. The return annotation still documents the response.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def schema_response(
+    content: Any, response: Response, status_code: int = status.HTTP_200_OK
+) -> SchemaResponse:
+    """Keeps the headers and cookies set on the route's temporal response, which
+    FastAPI drops when a route returns a response of its own."""
+    rendered = SchemaResponse(content, status_code=status_code)
+    rendered.raw_headers.extend(
+        header for header in response.raw_headers if header[0] != b"content-length"
+    )
+    return rendered
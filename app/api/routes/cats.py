@@ -1,45 +1,129 @@
 import uuid
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies.services import get_cats_service
-from app.schemas.cats import CatCreateSchema, CatSchema, CatUpdateSchema
+from app.api.dependencies.services import (
+    get_cats_service,
+    get_export_service,
+    get_import_service,
+)
+from app.api.responses import schema_response
+from app.config.settings import settings
+from app.core.etag import etag_matches
+from app.schemas.cats import (
+    CatCreateSchema,
+    CatFilterSchema,
+    CatImportResultSchema,
+    CatSchema,
+    CatUpdateSchema,
+)
+from app.schemas.common import BatchItemSchema, PageSchema
+from app.schemas.exports import ExportFormat
 from app.services.cats import CatService
+from app.services.exports import ExportService
+from app.services.imports import ImportService
 
 router = APIRouter(prefix="/cats", tags=["Cats"])
 
 
 @router.get("/")
 async def get_cats(
+    filters: Annotated[CatFilterSchema, Query()],
+    response: Response,
     cats_service: Annotated[CatService, Depends(get_cats_service)],
-) -> list[CatSchema]:
-    return await cats_service.get_cats()
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> PageSchema[CatSchema]:
+    if if_none_match:
+        etag = await cats_service.get_cats_etag(filters)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+    page = await cats_service.get_cats(filters)
+    response.headers["ETag"] = cats_service.cats_etag(page)
+    return schema_response(page, response)
+
+
+@router.get("/batch")
+async def get_cats_by_ids(
+    cat_ids: Annotated[
+        list[uuid.UUID],
+        Query(alias="ids", min_length=1, max_length=settings.BATCH_FETCH_MAX_SIZE),
+    ],
+    response: Response,
+    cats_service: Annotated[CatService, Depends(get_cats_service)],
+) -> list[BatchItemSchema[CatSchema]]:
+    cats = await cats_service.get_cats_by_ids(cat_ids)
+    return schema_response(cats, response)
+
+
+@router.get("/export")
+async def export_cats(
+    export_service: Annotated[ExportService, Depends(get_export_service)],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.export_cats(export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=cats.{export_format.value}"
+        },
+    )
 
 
 @router.get("/{cat_id}")
 async def get_cat(
     cat_id: uuid.UUID,
+    response: Response,
     cats_service: Annotated[CatService, Depends(get_cats_service)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ) -> CatSchema:
-    return await cats_service.get_cat(cat_id)
+    if if_none_match:
+        etag = await cats_service.get_cat_etag(cat_id)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+    cat = await cats_service.get_cat(cat_id)
+    response.headers["ETag"] = cats_service.cat_etag(cat)
+    return schema_response(cat, response)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_cat(
     cat_data: CatCreateSchema,
+    response: Response,
     cats_service: Annotated[CatService, Depends(get_cats_service)],
 ) -> CatSchema:
-    return await cats_service.create_cat(cat_data)
+    cat = await cats_service.create_cat(cat_data)
+    return schema_response(cat, response, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/import")
+async def import_cats(
+    request: Request,
+    response: Response,
+    import_service: Annotated[ImportService, Depends(get_import_service)],
+    import_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> CatImportResultSchema:
+    # The body is read as it arrives instead of being parsed up front
+    result = await import_service.import_cats(request.stream(), import_format)
+    return schema_response(result, response)
 
 
 @router.patch("/{cat_id}")
 async def update_cat(
     cat_id: uuid.UUID,
     cat_data: CatUpdateSchema,
+    response: Response,
     cats_service: Annotated[CatService, Depends(get_cats_service)],
 ) -> CatSchema:
-    return await cats_service.update_cat(cat_id, cat_data)
+    cat = await cats_service.update_cat(cat_id, cat_data)
+    return schema_response(cat, response)
 
 
 @router.delete("/{cat_id}", status_code=status.HTTP_204_NO_CONTENT)
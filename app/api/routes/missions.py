@@ -1,16 +1,29 @@
 import uuid
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies.services import get_missions_service
+from app.api.dependencies.events import get_mission_events
+from app.api.dependencies.services import get_export_service, get_missions_service
+from app.api.responses import schema_response
+from app.config.settings import settings
+from app.core.etag import etag_matches
+from app.core.events import EventBroker
+from app.schemas.common import BatchItemSchema, PageSchema
+from app.schemas.exports import ExportFormat
 from app.schemas.missions import (
+    MissionBulkCreateSchema,
     MissionCreateSchema,
+    MissionFilterSchema,
     MissionSchema,
     MissionUpdateSchema,
+    TargetBatchResultSchema,
+    TargetBatchUpdateSchema,
     TargetSchema,
     TargetUpdateSchema,
 )
+from app.services.exports import ExportService
 from app.services.missions import MissionService
 
 router = APIRouter(prefix="/missions", tags=["Missions"])
@@ -18,34 +31,133 @@ router = APIRouter(prefix="/missions", tags=["Missions"])
 
 @router.get("/")
 async def get_missions(
+    filters: Annotated[MissionFilterSchema, Query()],
+    response: Response,
     missions_service: Annotated[MissionService, Depends(get_missions_service)],
-) -> list[MissionSchema]:
-    return await missions_service.get_missions()
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> PageSchema[MissionSchema]:
+    if if_none_match:
+        etag = await missions_service.get_missions_etag(filters)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+    page = await missions_service.get_missions(filters)
+    response.headers["ETag"] = missions_service.missions_etag(page)
+    return schema_response(page, response)
+
+
+@router.get("/batch")
+async def get_missions_by_ids(
+    mission_ids: Annotated[
+        list[uuid.UUID],
+        Query(alias="ids", min_length=1, max_length=settings.BATCH_FETCH_MAX_SIZE),
+    ],
+    response: Response,
+    missions_service: Annotated[MissionService, Depends(get_missions_service)],
+) -> list[BatchItemSchema[MissionSchema]]:
+    missions = await missions_service.get_missions_by_ids(mission_ids)
+    return schema_response(missions, response)
+
+
+@router.get("/events")
+async def stream_mission_events(
+    mission_events: Annotated[EventBroker, Depends(get_mission_events)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        mission_events.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_missions(
+    export_service: Annotated[ExportService, Depends(get_export_service)],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.export_missions(export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=missions.{export_format.value}"
+        },
+    )
+
+
+@router.get("/targets/export")
+async def export_targets(
+    export_service: Annotated[ExportService, Depends(get_export_service)],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.export_targets(export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=targets.{export_format.value}"
+        },
+    )
 
 
 @router.get("/{mission_id}")
 async def get_mission(
     mission_id: uuid.UUID,
+    response: Response,
     missions_service: Annotated[MissionService, Depends(get_missions_service)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ) -> MissionSchema:
-    return await missions_service.get_mission(mission_id)
+    if if_none_match:
+        etag = await missions_service.get_mission_etag(mission_id)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+    mission = await missions_service.get_mission(mission_id)
+    response.headers["ETag"] = missions_service.mission_etag(mission)
+    return schema_response(mission, response)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_mission(
     mission_data: MissionCreateSchema,
+    response: Response,
     missions_service: Annotated[MissionService, Depends(get_missions_service)],
-) -> None:
-    await missions_service.create_mission(mission_data)
+) -> MissionSchema:
+    mission = await missions_service.create_mission(mission_data)
+    return schema_response(mission, response, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def create_missions(
+    missions_data: MissionBulkCreateSchema,
+    response: Response,
+    missions_service: Annotated[MissionService, Depends(get_missions_service)],
+) -> list[MissionSchema]:
+    missions = await missions_service.create_missions(missions_data.missions)
+    return schema_response(missions, response, status_code=status.HTTP_201_CREATED)
+
+
+@router.patch("/targets")
+async def update_targets(
+    targets_data: TargetBatchUpdateSchema,
+    response: Response,
+    missions_service: Annotated[MissionService, Depends(get_missions_service)],
+) -> list[TargetBatchResultSchema]:
+    results = await missions_service.update_targets(targets_data.targets)
+    return schema_response(results, response)
 
 
 @router.patch("/{mission_id}")
 async def update_mission(
     mission_id: uuid.UUID,
     mission_data: MissionUpdateSchema,
+    response: Response,
     missions_service: Annotated[MissionService, Depends(get_missions_service)],
 ) -> MissionSchema:
-    return await missions_service.update_mission(mission_id, mission_data)
+    mission = await missions_service.update_mission(mission_id, mission_data)
+    return schema_response(mission, response)
 
 
 @router.delete("/{mission_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -60,6 +172,8 @@ async def delete_mission(
 async def update_target(
     target_id: uuid.UUID,
     target_data: TargetUpdateSchema,
+    response: Response,
     missions_service: Annotated[MissionService, Depends(get_missions_service)],
 ) -> TargetSchema:
-    return await missions_service.update_target(target_id, target_data)
+    target = await missions_service.update_target(target_id, target_data)
+    return schema_response(target, response)
@@ -0,0 +1,55 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.dependencies.services import get_stats_service
+from app.api.responses import schema_response
+from app.config.settings import settings
+from app.schemas.stats import (
+    BreedCatStatsSchema,
+    CatMissionStatsSchema,
+    CountryTargetStatsSchema,
+    MissionTotalsSchema,
+)
+from app.services.stats import StatsService
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+@router.get("/missions")
+async def get_mission_totals(
+    response: Response,
+    stats_service: Annotated[StatsService, Depends(get_stats_service)],
+) -> MissionTotalsSchema:
+    totals = await stats_service.get_mission_totals()
+    return schema_response(totals, response)
+
+
+@router.get("/missions/by-cat")
+async def get_missions_by_cat(
+    response: Response,
+    stats_service: Annotated[StatsService, Depends(get_stats_service)],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.PAGINATION_MAX_LIMIT)
+    ] = settings.PAGINATION_DEFAULT_LIMIT,
+) -> list[CatMissionStatsSchema]:
+    stats = await stats_service.get_missions_by_cat(limit)
+    return schema_response(stats, response)
+
+
+@router.get("/targets/by-country")
+async def get_targets_by_country(
+    response: Response,
+    stats_service: Annotated[StatsService, Depends(get_stats_service)],
+) -> list[CountryTargetStatsSchema]:
+    stats = await stats_service.get_targets_by_country()
+    return schema_response(stats, response)
+
+
+@router.get("/cats/by-breed")
+async def get_cats_by_breed(
+    response: Response,
+    stats_service: Annotated[StatsService, Depends(get_stats_service)],
+) -> list[BreedCatStatsSchema]:
+    stats = await stats_service.get_cats_by_breed()
+    return schema_response(stats, response)
@@ -0,0 +1,64 @@
+"""Assignment worker: python -m app.assigner [--metrics-port PORT]
+
+Runs the mission assignment engine on its own, for deployments that keep
+ASSIGNMENT_ENABLED off in the API workers. Any number of assigners can run at
+the same time. Its cache invalidations are broadcast to the API workers.
+"""
+
+import argparse
+import asyncio
+import contextlib
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.api.routes.metrics import router as metrics_router
+from app.config.logs.log_config import setup_logging
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.cache import response_cache
+from app.core.database import engine
+from app.services.assignment import assignment_scheduler
+
+
+def metrics_server(host: str, port: int) -> uvicorn.Server:
+    metrics_app = FastAPI(title="Assignment worker")
+    metrics_app.include_router(metrics_router)
+    return uvicorn.Server(
+        uvicorn.Config(metrics_app, host=host, port=port, access_log=False)
+    )
+
+
+async def run(host: str, metrics_port: Optional[int]) -> None:
+    logger.info(
+        f"Assigning up to {assignment_scheduler.batch_size} missions"
+        f" every {assignment_scheduler.interval}s"
+    )
+    await response_cache.start()
+    await assignment_scheduler.start()
+    try:
+        if metrics_port is not None:
+            # Serves until SIGINT/SIGTERM, which uvicorn handles for the process
+            await metrics_server(host, metrics_port).serve()
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await assignment_scheduler.stop()
+        await response_cache.stop()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the mission assignment engine")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+
+    setup_logging()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run(args.host, args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
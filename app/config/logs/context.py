@@ -0,0 +1,7 @@
+import contextvars
+from typing import Optional
+
+# Set per request by the correlation id middleware and attached to every record
+correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "correlation_id", default=None
+)
@@ -1,12 +1,26 @@
+import atexit
+import datetime
+import json
 import logging
+import logging.config
+import queue
+import random
 import sys
+import zlib
 from copy import copy
+from logging.handlers import QueueHandler, QueueListener
 from typing import Literal, Optional
 
 import click
 
+from app.config.logs.context import correlation_id
 from app.config.settings import settings
 
+# Attributes every LogRecord has, anything else was passed through `extra`
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "correlation_id", "color_message"}
+
 
 class ColorizedFormatter(logging.Formatter):
     level_name_colors = {
@@ -55,19 +69,94 @@ class ColorizedFormatter(logging.Formatter):
         return super().formatMessage(recordcopy)
 
 
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the `extra` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(
+                record.created, tz=datetime.timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class CorrelationIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get() or "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the DEBUG/INFO records, warnings and errors always pass.
+
+    Within a request the decision is derived from the correlation id, so the
+    records of a sampled request are either all kept or all dropped.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        request_id = correlation_id.get()
+        if request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(request_id.encode()) % 10000 < self.rate * 10000
+
+
+class LoopQueueHandler(QueueHandler):
+    """Hands records over to the listener thread without formatting them.
+
+    Only the message is rendered here, so mutable arguments can't change before
+    the record is written. Formatting and I/O happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "default": {
             "()": "app.config.logs.log_config.ColorizedFormatter",
-            "fmt": "%(asctime)s | %(levelprefix)s | %(funcName)s | %(message)s",
+            "fmt": "%(asctime)s | %(levelprefix)s | %(correlation_id)s | %(funcName)s | %(message)s",
             "use_colors": True,
         },
+        "json": {
+            "()": "app.config.logs.log_config.JSONFormatter",
+        },
+    },
+    "filters": {
+        "correlation_id": {
+            "()": "app.config.logs.log_config.CorrelationIdFilter",
+        },
+        "sampling": {
+            "()": "app.config.logs.log_config.SamplingFilter",
+            "rate": settings.LOGGING_INFO_SAMPLE_RATE,
+        },
     },
     "handlers": {
         "default": {
-            "formatter": "default",
+            "formatter": "json" if settings.LOGGING_FORMAT == "json" else "default",
             "class": "logging.StreamHandler",
             "stream": "ext://sys.stdout",
         },
@@ -77,6 +166,34 @@ LOGGING_CONFIG = {
             "handlers": ["default"],
             "level": settings.LOGGING_LEVEL,
             "propagate": False,
+            # Logger filters run in the calling task, where the context is set
+            "filters": ["sampling", "correlation_id"],
         },
     },
 }
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> QueueListener:
+    """Applies LOGGING_CONFIG, then moves the main logger's handlers behind a
+    queue so that the event loop never blocks on a slow stdout. Only the first
+    call in a process does so, later ones return the same listener."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+    main_logger = logging.getLogger("main_logger")
+    handlers = list(main_logger.handlers)
+    for handler in handlers:
+        main_logger.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    main_logger.addHandler(LoopQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -1,4 +1,5 @@
 import pathlib
+from typing import Any, Callable, Optional
 
 import decouple
 from pydantic_settings import BaseSettings
@@ -6,12 +7,35 @@ from pydantic_settings import BaseSettings
 ROOT_DIR = pathlib.Path(__file__).parent.parent.parent.parent.resolve()
 
 
+def optional(cast: Callable[[str], Any]) -> Callable[[Optional[str]], Any]:
+    return lambda value: None if value in (None, "") else cast(value)
+
+
 class BackendBaseSettings(BaseSettings):
     # Web
     WEB_URL: str = decouple.config("WEB_URL", default="http://localhost:3000")
     LOGGING_LEVEL: str = decouple.config("LOGGING_LEVEL", default="DEBUG")
+    # "color" for development, "json" for production log collectors
+    LOGGING_FORMAT: str = decouple.config("LOGGING_FORMAT", default="color")
+    # Share of requests whose DEBUG/INFO records are kept, warnings are never dropped
+    LOGGING_INFO_SAMPLE_RATE: float = decouple.config(
+        "LOGGING_INFO_SAMPLE_RATE", default=1.0, cast=float
+    )
     IS_ALLOWED_CREDENTIALS: bool = decouple.config("IS_ALLOWED_CREDENTIALS", cast=bool)
 
+    # Production server (python -m app.server), workers default to the usable CPUs
+    SERVER_HOST: str = decouple.config("SERVER_HOST", default="0.0.0.0")
+    SERVER_PORT: int = decouple.config("SERVER_PORT", default=8000, cast=int)
+    SERVER_WORKERS: Optional[int] = decouple.config(
+        "SERVER_WORKERS", default=None, cast=optional(int)
+    )
+    SERVER_BACKLOG: int = decouple.config("SERVER_BACKLOG", default=2048, cast=int)
+    SERVER_KEEP_ALIVE: int = decouple.config("SERVER_KEEP_ALIVE", default=5, cast=int)
+    # Seconds in-flight requests get to finish after SIGTERM
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = decouple.config(
+        "SERVER_GRACEFUL_SHUTDOWN_TIMEOUT", default=30, cast=int
+    )
+
     # Database
     POSTGRES_USER: str = decouple.config("POSTGRES_USER")
     POSTGRES_PASSWORD: str = decouple.config("POSTGRES_PASSWORD")
@@ -19,6 +43,161 @@ class BackendBaseSettings(BaseSettings):
     POSTGRES_PORT: int = decouple.config("POSTGRES_PORT", cast=int)
     POSTGRES_HOST: str = decouple.config("POSTGRES_HOST")
 
+    # Optional read replica (full SQLAlchemy URL) used by read-only requests
+    POSTGRES_REPLICA_URL: Optional[str] = decouple.config(
+        "POSTGRES_REPLICA_URL", default=None
+    )
+    # Seconds a client keeps reading from the primary after a write
+    DB_READ_YOUR_WRITES_WINDOW: int = decouple.config(
+        "DB_READ_YOUR_WRITES_WINDOW", default=5, cast=int
+    )
+
+    # Database engine, unset values are taken from the DB_PROFILE preset
+    DB_PROFILE: str = decouple.config("DB_PROFILE", default="development")
+    DB_ECHO: Optional[bool] = decouple.config(
+        "DB_ECHO", default=None, cast=optional(decouple.strtobool)
+    )
+    DB_POOL_SIZE: Optional[int] = decouple.config(
+        "DB_POOL_SIZE", default=None, cast=optional(int)
+    )
+    DB_MAX_OVERFLOW: Optional[int] = decouple.config(
+        "DB_MAX_OVERFLOW", default=None, cast=optional(int)
+    )
+    DB_POOL_TIMEOUT: Optional[float] = decouple.config(
+        "DB_POOL_TIMEOUT", default=None, cast=optional(float)
+    )
+    DB_POOL_RECYCLE: Optional[int] = decouple.config(
+        "DB_POOL_RECYCLE", default=None, cast=optional(int)
+    )
+    DB_POOL_PRE_PING: Optional[bool] = decouple.config(
+        "DB_POOL_PRE_PING", default=None, cast=optional(decouple.strtobool)
+    )
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = decouple.config(
+        "DB_STATEMENT_CACHE_SIZE", default=None, cast=optional(int)
+    )
+    # Milliseconds, 0 disables the timeout
+    DB_STATEMENT_TIMEOUT: Optional[int] = decouple.config(
+        "DB_STATEMENT_TIMEOUT", default=None, cast=optional(int)
+    )
+
+    # Opt-in N+1 detector: warn when a request issues more statements than this
+    DB_STATEMENT_BUDGET: Optional[int] = decouple.config(
+        "DB_STATEMENT_BUDGET", default=None, cast=optional(int)
+    )
+
+    # Pagination
+    PAGINATION_DEFAULT_LIMIT: int = decouple.config(
+        "PAGINATION_DEFAULT_LIMIT", default=50, cast=int
+    )
+    PAGINATION_MAX_LIMIT: int = decouple.config(
+        "PAGINATION_MAX_LIMIT", default=500, cast=int
+    )
+
+    # Ids accepted by the batch fetch endpoints
+    BATCH_FETCH_MAX_SIZE: int = decouple.config(
+        "BATCH_FETCH_MAX_SIZE", default=200, cast=int
+    )
+
+    # Missions
+    MISSIONS_BULK_MAX_SIZE: int = decouple.config(
+        "MISSIONS_BULK_MAX_SIZE", default=500, cast=int
+    )
+    TARGETS_BATCH_MAX_SIZE: int = decouple.config(
+        "TARGETS_BATCH_MAX_SIZE", default=500, cast=int
+    )
+
+    # Response cache
+    CACHE_ENABLED: bool = decouple.config("CACHE_ENABLED", default=True, cast=bool)
+    CACHE_TTL: int = decouple.config("CACHE_TTL", default=30, cast=int)
+    CACHE_MAX_ENTRIES: int = decouple.config(
+        "CACHE_MAX_ENTRIES", default=10000, cast=int
+    )
+
+    # Coalescing of concurrent identical reads, the window (seconds) also lets
+    # reads arriving shortly after a load finished reuse its result
+    SINGLE_FLIGHT_ENABLED: bool = decouple.config(
+        "SINGLE_FLIGHT_ENABLED", default=True, cast=bool
+    )
+    SINGLE_FLIGHT_WINDOW: float = decouple.config(
+        "SINGLE_FLIGHT_WINDOW", default=0.05, cast=float
+    )
+
+    # Auto-assignment of unassigned missions to available cats. Runs in the app
+    # when enabled, or on its own with python -m app.assigner
+    ASSIGNMENT_ENABLED: bool = decouple.config(
+        "ASSIGNMENT_ENABLED", default=False, cast=bool
+    )
+    ASSIGNMENT_BATCH_SIZE: int = decouple.config(
+        "ASSIGNMENT_BATCH_SIZE", default=100, cast=int
+    )
+    ASSIGNMENT_INTERVAL: float = decouple.config(
+        "ASSIGNMENT_INTERVAL", default=5.0, cast=float
+    )
+
+    # Seconds between folds of the stats deltas appended by writers into the
+    # rollups, reads add up the deltas still pending
+    STATS_COMPACTION_INTERVAL: float = decouple.config(
+        "STATS_COMPACTION_INTERVAL", default=10.0, cast=float
+    )
+
+    # Mission events stream. Each open stream queues up to EVENTS_QUEUE_SIZE
+    # events, the oldest ones are dropped when a client falls behind
+    EVENTS_QUEUE_SIZE: int = decouple.config("EVENTS_QUEUE_SIZE", default=256, cast=int)
+    EVENTS_KEEPALIVE_INTERVAL: float = decouple.config(
+        "EVENTS_KEEPALIVE_INTERVAL", default=15.0, cast=float
+    )
+    EVENTS_RECONNECT_INTERVAL: float = decouple.config(
+        "EVENTS_RECONNECT_INTERVAL", default=1.0, cast=float
+    )
+
+    # Idempotency-Key support on the create endpoints. A duplicate of a request
+    # still running polls its key every IDEMPOTENCY_POLL_INTERVAL seconds, for up
+    # to IDEMPOTENCY_WAIT_TIMEOUT seconds. A key left pending by a worker that
+    # died is taken over after IDEMPOTENCY_PENDING_TTL seconds
+    IDEMPOTENCY_KEY_TTL: int = decouple.config(
+        "IDEMPOTENCY_KEY_TTL", default=86400, cast=int
+    )
+    IDEMPOTENCY_PENDING_TTL: int = decouple.config(
+        "IDEMPOTENCY_PENDING_TTL", default=300, cast=int
+    )
+    IDEMPOTENCY_WAIT_TIMEOUT: float = decouple.config(
+        "IDEMPOTENCY_WAIT_TIMEOUT", default=10.0, cast=float
+    )
+    IDEMPOTENCY_POLL_INTERVAL: float = decouple.config(
+        "IDEMPOTENCY_POLL_INTERVAL", default=0.1, cast=float
+    )
+    IDEMPOTENCY_PURGE_INTERVAL: int = decouple.config(
+        "IDEMPOTENCY_PURGE_INTERVAL", default=3600, cast=int
+    )
+
+    # Cat imports, valid rows are spooled in memory up to CATS_IMPORT_SPOOL_MEMORY
+    # bytes, then to a temporary file, until the upload is read to the end
+    CATS_IMPORT_SPOOL_MEMORY: int = decouple.config(
+        "CATS_IMPORT_SPOOL_MEMORY", default=16 * 1024 * 1024, cast=int
+    )
+    CATS_IMPORT_MAX_ERRORS: int = decouple.config(
+        "CATS_IMPORT_MAX_ERRORS", default=1000, cast=int
+    )
+
+    # Exports
+    EXPORT_CHUNK_SIZE: int = decouple.config(
+        "EXPORT_CHUNK_SIZE", default=1000, cast=int
+    )
+
+    # Breeds catalogue
+    BREEDS_API_URL: str = decouple.config(
+        "BREEDS_API_URL", default="https://api.thecatapi.com/v1/breeds"
+    )
+    BREEDS_REQUEST_TIMEOUT: float = decouple.config(
+        "BREEDS_REQUEST_TIMEOUT", default=10.0, cast=float
+    )
+    BREEDS_REFRESH_INTERVAL: int = decouple.config(
+        "BREEDS_REFRESH_INTERVAL", default=3600, cast=int
+    )
+    BREEDS_SNAPSHOT_PATH: Optional[str] = decouple.config(
+        "BREEDS_SNAPSHOT_PATH", default=None
+    )
+
     # CORS
     ALLOWED_ORIGINS: list[str] = ["*"]
     ALLOWED_METHODS: list[str] = ["*"]
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import pathlib
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+import httpx
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+
+
+class BreedCatalogueUnavailableError(Exception):
+    pass
+
+
+def normalize_breed(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class BreedSource(ABC):
+    @abstractmethod
+    async def fetch(self) -> list[str]:
+        raise NotImplementedError
+
+
+class TheCatApiBreedSource(BreedSource):
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+
+    async def fetch(self) -> list[str]:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            return [breed["name"] for breed in response.json()]
+
+
+class StaticBreedSource(BreedSource):
+    def __init__(self, breeds: Iterable[str]):
+        self.breeds = list(breeds)
+
+    async def fetch(self) -> list[str]:
+        return list(self.breeds)
+
+
+class BreedRegistry:
+    """In-memory breed catalogue keyed by normalized name.
+
+    Lookups never hit the network once the catalogue is loaded: stale data keeps
+    being served while a background refresh fetches a new copy from the source.
+    """
+
+    def __init__(
+        self,
+        source: BreedSource,
+        ttl: float,
+        snapshot_path: Optional[str] = None,
+    ):
+        self.source = source
+        self.ttl = ttl
+        self.snapshot_path = pathlib.Path(snapshot_path) if snapshot_path else None
+        self._breeds: dict[str, str] = {}
+        self._expires_at: float = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._revalidation: Optional[asyncio.Task] = None
+        self._scheduler: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._breeds)
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    async def start(self) -> None:
+        await self.load()
+        self._scheduler = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        tasks = [
+            task
+            for task in (self._scheduler, self._revalidation, self._refreshing)
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = self._revalidation = self._refreshing = None
+
+    async def load(self) -> None:
+        # A snapshot refreshed by the server before forking, or by another worker,
+        # is reused while it is fresh instead of calling the source again
+        if await self.load_snapshot() and not self.is_stale:
+            return
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logger.warning(f"Breed source is unavailable, using the snapshot: {exc}")
+
+    async def refresh(self) -> None:
+        # Concurrent callers share the fetch in flight and its outcome, so a cold
+        # registry calls the source once however many requests are waiting, and
+        # an unavailable source fails all of them after a single timeout
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._fetch())
+            # Retrieves the failure when every waiter was cancelled
+            self._refreshing.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        await asyncio.shield(self._refreshing)
+
+    async def _fetch(self) -> None:
+        breeds = await self.source.fetch()
+        if not breeds:
+            raise BreedCatalogueUnavailableError("Breed source returned no breeds")
+        self._replace(breeds)
+        logger.info(f"Breed catalogue refreshed ({len(self._breeds)} breeds)")
+        await self._write_snapshot(list(self._breeds.values()))
+
+    async def load_snapshot(self) -> bool:
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        breeds, modified_at = await asyncio.to_thread(self._read_snapshot)
+        self._replace(breeds)
+        # The snapshot ages from the moment it was written
+        self._expires_at -= max(time.time() - modified_at, 0)
+        logger.info(f"Breed catalogue loaded from the snapshot ({len(breeds)} breeds)")
+        return True
+
+    async def resolve(self, name: str) -> Optional[str]:
+        """Returns the canonical breed name or None if the breed is unknown."""
+        if not self.is_loaded:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                raise BreedCatalogueUnavailableError(str(exc)) from exc
+        elif self.is_stale:
+            self._schedule_revalidation()
+        return self._breeds.get(normalize_breed(name))
+
+    def _replace(self, breeds: Iterable[str]) -> None:
+        self._breeds = {normalize_breed(breed): breed for breed in breeds}
+        self._expires_at = time.monotonic() + self.ttl
+
+    def _schedule_revalidation(self) -> None:
+        if self._revalidation is None or self._revalidation.done():
+            self._revalidation = asyncio.create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as exc:
+            logger.warning(f"Failed to refresh the breed catalogue: {exc}")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(max(self._expires_at - time.monotonic(), 0) or self.ttl)
+            await self._refresh_quietly()
+
+    def _read_snapshot(self) -> tuple[list[str], float]:
+        modified_at = self.snapshot_path.stat().st_mtime
+        return json.loads(self.snapshot_path.read_text()), modified_at
+
+    async def _write_snapshot(self, breeds: list[str]) -> None:
+        if self.snapshot_path is None:
+            return
+        try:
+            await asyncio.to_thread(self._dump_snapshot, breeds)
+        except OSError as exc:
+            logger.warning(f"Failed to write the breed snapshot: {exc}")
+
+    def _dump_snapshot(self, breeds: list[str]) -> None:
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(sorted(breeds)))
+        tmp_path.replace(self.snapshot_path)
+
+
+breed_registry = BreedRegistry(
+    source=TheCatApiBreedSource(
+        settings.BREEDS_API_URL, timeout=settings.BREEDS_REQUEST_TIMEOUT
+    ),
+    ttl=settings.BREEDS_REFRESH_INTERVAL,
+    snapshot_path=settings.BREEDS_SNAPSHOT_PATH,
+)
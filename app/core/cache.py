@@ -0,0 +1,427 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional, TypeVar
+
+import asyncpg
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.events import NotificationListener, connect_listener
+from app.core.metrics import metrics
+from app.core.singleflight import SingleFlight
+
+ValueT = TypeVar("ValueT")
+IdentT = TypeVar("IdentT", bound=Hashable)
+
+CACHE_INVALIDATIONS_CHANNEL = "cache_invalidations"
+# Broadcast in place of the tags when there are too many to send, every worker
+# then drops its whole cache
+ALL_TAGS = "*"
+# NOTIFY payloads are limited to 8000 bytes
+MAX_PAYLOAD_SIZE = 7900
+
+cache_requests = metrics.counter(
+    "cache_requests_total",
+    "Response cache lookups",
+    labels=("namespace", "result"),
+)
+cache_invalidations_received = metrics.counter(
+    "cache_invalidations_received_total",
+    "Cache invalidations received from the other workers",
+)
+
+
+def tag(namespace: str, instance_id: Any) -> str:
+    return f"{namespace}:{instance_id}"
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """LRU cache with a per-entry TTL and a tag index for targeted invalidation."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any, tuple[str, ...]]] = (
+            OrderedDict()
+        )
+        self._tags: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        self._discard(key)
+        entry_tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + self.ttl, value, entry_tags)
+        for entry_tag in entry_tags:
+            self._tags.setdefault(entry_tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        self.evict_tags(tags)
+
+    async def clear(self) -> None:
+        self.evict_all()
+
+    def evict_tags(self, tags: Iterable[str]) -> None:
+        for entry_tag in tags:
+            for key in self._tags.pop(entry_tag, ()):
+                self._discard(key)
+
+    def evict_all(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for entry_tag in entry[2]:
+            keys = self._tags.get(entry_tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry_tag]
+
+
+class InvalidationBroadcast(NotificationListener):
+    """Carries cache invalidations between workers over a Postgres channel.
+
+    Tags are queued by publish() and sent from a background task on the
+    listener's own connection, so invalidating never waits on the database.
+    Tags received from the other workers are handed to on_invalidate, and
+    on_lost is called whenever the listener disconnects or reconnects, since
+    whatever is sent while it is down never arrives.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        channel: str,
+        reconnect_interval: float,
+        max_pending: int,
+    ):
+        super().__init__(connect, channel, reconnect_interval)
+        self.max_pending = max_pending
+        self.on_invalidate: Callable[[Iterable[str]], None] = lambda tags: None
+        self.on_lost: Callable[[], None] = lambda: None
+        self._pending: set[str] = set()
+        self._ready = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.connection is not None
+
+    async def start(self) -> None:
+        await super().start()
+        self._sender = asyncio.create_task(self._send_pending())
+
+    async def stop(self) -> None:
+        if self._sender is not None:
+            self._sender.cancel()
+            await asyncio.gather(self._sender, return_exceptions=True)
+            self._sender = None
+        await super().stop()
+
+    def publish(self, tags: Iterable[str]) -> None:
+        self._pending.update(tags)
+        if len(self._pending) > self.max_pending:
+            self._pending = {ALL_TAGS}
+        self._ready.set()
+
+    def on_listening(self) -> None:
+        self.on_lost()
+        self._ready.set()
+
+    def on_closed(self) -> None:
+        self.on_lost()
+
+    def on_notification(self, pid: int, payload: str) -> None:
+        # The connection receives its own notifications too
+        if self.connection is not None and pid == self.connection.get_server_pid():
+            return
+        cache_invalidations_received.inc()
+        tags = json.loads(payload)
+        if ALL_TAGS in tags:
+            self.on_lost()
+        else:
+            self.on_invalidate(tags)
+
+    async def _send_pending(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            connection = self.connection
+            if connection is None or not self._pending:
+                continue
+
+            tags, self._pending = self._pending, set()
+            try:
+                for payload in self._payloads(sorted(tags)):
+                    await connection.execute(
+                        "SELECT pg_notify($1, $2)", self.channel, payload
+                    )
+            except Exception as exc:
+                # Sent again once the listener is back
+                logger.warning(f"Failed to broadcast cache invalidations: {exc}")
+                self.publish(tags)
+                self._ready.clear()
+
+    @staticmethod
+    def _payloads(tags: list[str]) -> Iterable[str]:
+        batch: list[str] = []
+        size = 2
+        for entry_tag in tags:
+            tag_size = len(json.dumps(entry_tag)) + 1
+            if batch and size + tag_size > MAX_PAYLOAD_SIZE:
+                yield json.dumps(batch, separators=(",", ":"))
+                batch, size = [], 2
+            batch.append(entry_tag)
+            size += tag_size
+        if batch:
+            yield json.dumps(batch, separators=(",", ":"))
+
+
+class ResponseCache:
+    """Two-tier read-through cache: a per-process LRU in front of an optional
+    shared backend.
+
+    Invalidations are applied to the local tier at once and reach the other
+    workers' through the broadcast. Entries are only stored while the broadcast
+    is connected, and every local entry is dropped whenever it disconnects or
+    reconnects, so a worker never keeps serving what another one invalidated.
+    Reads routed to a replica are cached apart from those of the primary, and
+    aren't stored when one of their tags was invalidated within the last
+    replica_lag seconds, as the replica may not have replayed the write yet.
+    Misses can be coalesced through a SingleFlight, which keeps working when
+    caching itself is disabled.
+    """
+
+    def __init__(
+        self,
+        local: InMemoryCacheBackend,
+        shared: Optional[CacheBackend] = None,
+        enabled: bool = True,
+        single_flight: Optional[SingleFlight] = None,
+        broadcast: Optional[InvalidationBroadcast] = None,
+        replica_lag: float = 0.0,
+    ):
+        self.local = local
+        self.shared = shared
+        self.enabled = enabled
+        self.single_flight = single_flight
+        self.broadcast = broadcast
+        self.replica_lag = replica_lag
+        self._generation = 0
+        self._cleared_at = 0
+        # Generation and time of the latest invalidation per tag, used to drop
+        # values that were loaded before a concurrent write committed
+        self._invalidated_at: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        if broadcast is not None:
+            broadcast.on_invalidate = self._invalidate_local
+            broadcast.on_lost = self._clear_local
+
+    async def start(self) -> None:
+        if self.broadcast is not None:
+            await self.broadcast.start()
+
+    async def stop(self) -> None:
+        if self.broadcast is not None:
+            await self.broadcast.stop()
+
+    async def get(self, key: str) -> Optional[Any]:
+        namespace = key.split(":", 1)[0]
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                await self.local.set(key, value)
+
+        cache_requests.inc(
+            namespace=namespace, result="miss" if value is None else "hit"
+        )
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        await self.local.set(key, value, tags)
+        if self.shared is not None:
+            await self.shared.set(key, value, tags)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[ValueT]],
+        tags: Callable[[ValueT], Iterable[str]],
+        replica: bool = False,
+    ) -> ValueT:
+        # Loads are coalesced per route too, a primary-pinned read never joins a
+        # load running on a replica
+        routed_key = self._routed(key, replica)
+        if not self.enabled:
+            return await self._load(routed_key, loader, tags)
+
+        value = await self.get(routed_key)
+        if value is not None:
+            return value
+
+        generation = self._generation
+        value = await self._load(routed_key, loader, tags)
+        entry_tags = tuple(tags(value))
+        if self._is_storable(entry_tags, generation, replica):
+            await self.set(routed_key, value, entry_tags)
+        return value
+
+    async def get_many_or_load(
+        self,
+        keys: dict[IdentT, str],
+        loader: Callable[[list[IdentT]], Awaitable[dict[IdentT, ValueT]]],
+        tags: Callable[[ValueT], Iterable[str]],
+        replica: bool = False,
+    ) -> dict[IdentT, ValueT]:
+        """Looks every key up and loads all the misses with a single loader call.
+
+        The loader leaves out the identifiers it found nothing for.
+        """
+        if not self.enabled:
+            return await loader(list(keys))
+
+        keys = {ident: self._routed(key, replica) for ident, key in keys.items()}
+        values = {}
+        for ident, key in keys.items():
+            value = await self.get(key)
+            if value is not None:
+                values[ident] = value
+
+        missing = [ident for ident in keys if ident not in values]
+        if missing:
+            generation = self._generation
+            loaded = await loader(missing)
+            for ident, value in loaded.items():
+                entry_tags = tuple(tags(value))
+                if self._is_storable(entry_tags, generation, replica):
+                    await self.set(keys[ident], value, entry_tags)
+            values.update(loaded)
+        return values
+
+    async def invalidate(self, *tags: str) -> None:
+        self._invalidate_local(tags)
+        if self.broadcast is not None:
+            self.broadcast.publish(tags)
+        if self.enabled and self.shared is not None:
+            await self.shared.invalidate_tags(tags)
+
+    async def clear(self) -> None:
+        await self.local.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        if self.single_flight is not None:
+            self.single_flight.forget(tags)
+        if not self.enabled:
+            return
+
+        self._generation += 1
+        invalidated_at = (self._generation, time.monotonic())
+        for entry_tag in tags:
+            self._invalidated_at[entry_tag] = invalidated_at
+            self._invalidated_at.move_to_end(entry_tag)
+        while len(self._invalidated_at) > self.local.max_entries:
+            self._invalidated_at.popitem(last=False)
+        self.local.evict_tags(tags)
+
+    def _clear_local(self) -> None:
+        if self.single_flight is not None:
+            self.single_flight.clear()
+        self._generation += 1
+        self._cleared_at = self._generation
+        self.local.evict_all()
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[ValueT]],
+        tags: Callable[[ValueT], Iterable[str]],
+    ) -> ValueT:
+        if self.single_flight is None:
+            return await loader()
+        return await self.single_flight.do(key, loader, tags)
+
+    @staticmethod
+    def _routed(key: str, replica: bool) -> str:
+        return f"{key}@replica" if replica else key
+
+    def _is_storable(self, tags: Iterable[str], generation: int, replica: bool) -> bool:
+        if self.broadcast is not None and not self.broadcast.connected:
+            return False
+        if self._cleared_at > generation:
+            return False
+        now = time.monotonic()
+        for entry_tag in tags:
+            invalidated_at = self._invalidated_at.get(entry_tag)
+            if invalidated_at is None:
+                continue
+            invalidated_generation, invalidated_time = invalidated_at
+            if invalidated_generation > generation:
+                return False
+            if replica and now - invalidated_time < self.replica_lag:
+                return False
+        return True
+
+
+response_cache = ResponseCache(
+    local=InMemoryCacheBackend(
+        max_entries=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL
+    ),
+    enabled=settings.CACHE_ENABLED,
+    single_flight=(
+        SingleFlight(window=settings.SINGLE_FLIGHT_WINDOW)
+        if settings.SINGLE_FLIGHT_ENABLED
+        else None
+    ),
+    broadcast=InvalidationBroadcast(
+        connect=connect_listener,
+        channel=CACHE_INVALIDATIONS_CHANNEL,
+        reconnect_interval=settings.EVENTS_RECONNECT_INTERVAL,
+        max_pending=settings.CACHE_MAX_ENTRIES,
+    ),
+    replica_lag=settings.DB_READ_YOUR_WRITES_WINDOW,
+)
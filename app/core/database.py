@@ -1,16 +1,161 @@
-from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config.settings import settings
+from app.core.instrumentation import instrument_engine
+from app.core.metrics import metrics
 
 DATABASE_URL: str = (
     f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
+ENGINE_PROFILES: dict[str, dict[str, Any]] = {
+    "development": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_cache_size": 100,
+        "statement_timeout": 0,
+    },
+    # Sized per worker: (pool_size + max_overflow) * workers must stay below
+    # Postgres max_connections minus the connections reserved for maintenance
+    "production": {
+        "echo": False,
+        "pool_size": 10,
+        "max_overflow": 5,
+        "pool_timeout": 5.0,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 500,
+        "statement_timeout": 15000,
+    },
+}
+
+pool_wait_seconds = metrics.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pool connection",
+    labels=("pool",),
+)
+pool_timeouts = metrics.counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that exceeded the pool timeout",
+    labels=("pool",),
+)
+pool_size = metrics.gauge("db_pool_size", "Configured pool size", labels=("pool",))
+pool_checked_out = metrics.gauge(
+    "db_pool_checked_out", "Connections currently checked out", labels=("pool",)
+)
+pool_overflow = metrics.gauge(
+    "db_pool_overflow", "Overflow connections currently open", labels=("pool",)
+)
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    pool_label = "primary"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_timeouts.inc(pool=self.pool_label)
+            raise
+        finally:
+            pool_wait_seconds.observe(
+                time.perf_counter() - started, pool=self.pool_label
+            )
+
+
+def get_engine_options(profile: str) -> dict[str, Any]:
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+
+    overrides = {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "statement_timeout": settings.DB_STATEMENT_TIMEOUT,
+    }
+    options = {
+        **ENGINE_PROFILES[profile],
+        **{key: value for key, value in overrides.items() if value is not None},
+    }
+    statement_cache_size = options.pop("statement_cache_size")
+    statement_timeout = options.pop("statement_timeout")
+    options["connect_args"] = {
+        # SQLAlchemy prepares statements itself, asyncpg's own cache is kept in
+        # sync so both can be disabled together (e.g. behind pgbouncer)
+        "prepared_statement_cache_size": statement_cache_size,
+        "statement_cache_size": statement_cache_size,
+        "server_settings": {"statement_timeout": str(statement_timeout)},
+    }
+    return options
+
+
+def create_engine(url: str, pool_label: str) -> AsyncEngine:
+    poolclass = type(
+        "InstrumentedAsyncQueuePool",
+        (InstrumentedAsyncQueuePool,),
+        {"pool_label": pool_label},
+    )
+    new_engine = create_async_engine(
+        url, poolclass=poolclass, **get_engine_options(settings.DB_PROFILE)
+    )
+
+    instrument_engine(new_engine)
+
+    # The engine's pool is replaced on dispose(), so always read the current one
+    pool_size.set_function(lambda: new_engine.pool.size(), pool=pool_label)
+    pool_checked_out.set_function(lambda: new_engine.pool.checkedout(), pool=pool_label)
+    pool_overflow.set_function(
+        lambda: max(new_engine.pool.overflow(), 0), pool=pool_label
+    )
+    return new_engine
+
+
+async def warm_up(target_engine: AsyncEngine) -> None:
+    """Opens the pool's persistent connections up front so the first requests
+    don't pay for connection setup."""
+    connections = await asyncio.gather(
+        *(target_engine.connect() for _ in range(target_engine.pool.size()))
+    )
+    for connection in connections:
+        await connection.close()
+
+
+engine = create_engine(DATABASE_URL, pool_label="primary")
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+replica_engine = (
+    create_engine(settings.POSTGRES_REPLICA_URL, pool_label="replica")
+    if settings.POSTGRES_REPLICA_URL
+    else engine
+)
+# Sessions tell the services through their info whether they read from a replica
+replica_session_maker = async_sessionmaker(
+    replica_engine,
+    expire_on_commit=False,
+    info={"replica": replica_engine is not engine},
+)
@@ -0,0 +1,25 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+
+def _encode(part: Any) -> str:
+    return part.isoformat() if isinstance(part, datetime) else str(part)
+
+
+def make_etag(versions: Iterable[Iterable[Any]]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for version in versions:
+        digest.update("|".join(_encode(part) for part in version).encode())
+        digest.update(b"\n")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110, 13.1.2)
+    if not if_none_match or etag is None:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
@@ -0,0 +1,206 @@
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import asyncpg
+from sqlalchemy import Select, Text, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.metrics import metrics
+
+MISSION_EVENTS_CHANNEL = "mission_events"
+
+# Sent when a subscriber may have missed events and has to reload what it shows
+RESYNC_MESSAGE = b"event: resync\ndata: {}\n\n"
+KEEPALIVE_MESSAGE = b": keepalive\n\n"
+
+events_received = metrics.counter(
+    "events_received_total", "Notifications received by the event listener"
+)
+events_dropped = metrics.counter(
+    "events_dropped_total", "Events dropped from the queues of slow subscribers"
+)
+event_subscribers = metrics.gauge("event_subscribers", "Open event streams")
+
+
+def notify_query(payloads: list[str], channel: str = MISSION_EVENTS_CHANNEL) -> Select:
+    # NOTIFY is transactional: the payloads are delivered once the surrounding
+    # transaction commits, and never if it rolls back
+    return select(func.pg_notify(channel, func.unnest(literal(payloads, ARRAY(Text)))))
+
+
+def format_event(payload: str) -> bytes:
+    try:
+        event_type = json.loads(payload)["type"]
+    except (ValueError, KeyError, TypeError):
+        event_type = "message"
+    return f"event: {event_type}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    """Bounded queue of formatted events. When it is full the oldest event is
+    dropped, and the subscriber is told to resync before the next delivery."""
+
+    def __init__(self, max_size: int):
+        self._events: deque[bytes] = deque(maxlen=max_size)
+        self._ready = asyncio.Event()
+        self.lost = False
+
+    def put(self, message: bytes) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.lost = True
+            events_dropped.inc()
+        self._events.append(message)
+        self._ready.set()
+
+    def lose(self) -> None:
+        self.lost = True
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> list[bytes]:
+        """Returns every queued message, or nothing once the timeout expires."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        messages = [RESYNC_MESSAGE] if self.lost else []
+        messages.extend(self._events)
+        self._events.clear()
+        self.lost = False
+        return messages
+
+
+class NotificationListener:
+    """Listens on a Postgres channel with a single connection held outside the
+    engine's pool, and reconnects whenever that connection is lost."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        channel: str,
+        reconnect_interval: float,
+    ):
+        self.connect = connect
+        self.channel = channel
+        self.reconnect_interval = reconnect_interval
+        self.connection: Optional[asyncpg.Connection] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def on_listening(self) -> None:
+        """Called each time the listener (re)connects: whatever was sent while
+        it was down is lost."""
+
+    def on_closed(self) -> None:
+        """Called each time the listener's connection is lost."""
+
+    def on_notification(self, pid: int, payload: str) -> None:
+        raise NotImplementedError
+
+    def _on_notification(
+        self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        self.on_notification(pid, payload)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                connection = await self.connect()
+            except Exception as exc:
+                logger.warning(f"Failed to connect the {self.channel} listener: {exc}")
+                await asyncio.sleep(self.reconnect_interval)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            try:
+                await connection.add_listener(self.channel, self._on_notification)
+                self.connection = connection
+                self.on_listening()
+                logger.info(f"Listening for notifications on {self.channel}")
+                await closed.wait()
+                logger.warning(f"The {self.channel} listener connection was closed")
+            except Exception as exc:
+                logger.warning(f"The {self.channel} listener failed: {exc}")
+            finally:
+                self.connection = None
+                self.on_closed()
+                await connection.close()
+            await asyncio.sleep(self.reconnect_interval)
+
+
+class EventBroker(NotificationListener):
+    """Fans Postgres notifications out to in-process subscribers.
+
+    Each worker holds a single connection listening on the channel, however many
+    clients are subscribed. A notification is formatted once and the same bytes
+    are queued for every subscriber.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        channel: str,
+        queue_size: int,
+        keepalive_interval: float,
+        reconnect_interval: float,
+    ):
+        super().__init__(connect, channel, reconnect_interval)
+        self.queue_size = queue_size
+        self.keepalive_interval = keepalive_interval
+        self._subscriptions: set[Subscription] = set()
+        event_subscribers.set_function(lambda: len(self._subscriptions))
+
+    def publish(self, message: bytes) -> None:
+        for subscription in self._subscriptions:
+            subscription.put(message)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        subscription = Subscription(self.queue_size)
+        self._subscriptions.add(subscription)
+        try:
+            while True:
+                messages = await subscription.wait(self.keepalive_interval)
+                # Keepalives also let the server notice clients that went away
+                yield b"".join(messages) if messages else KEEPALIVE_MESSAGE
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def on_listening(self) -> None:
+        for subscription in self._subscriptions:
+            subscription.lose()
+
+    def on_notification(self, pid: int, payload: str) -> None:
+        events_received.inc()
+        self.publish(format_event(payload))
+
+
+def connect_listener() -> Awaitable[asyncpg.Connection]:
+    return asyncpg.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database=settings.POSTGRES_DB,
+    )
+
+
+mission_events = EventBroker(
+    connect=connect_listener,
+    channel=MISSION_EVENTS_CHANNEL,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    keepalive_interval=settings.EVENTS_KEEPALIVE_INTERVAL,
+    reconnect_interval=settings.EVENTS_RECONNECT_INTERVAL,
+)
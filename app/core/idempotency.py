@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.database import engine
+from app.models.idempotency import IdempotencyKey
+
+
+class IdempotencyKeyMismatchError(Exception):
+    pass
+
+
+class IdempotencyKeyInProgressError(Exception):
+    pass
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass
+class Claim:
+    """Result of claiming a key: either the response stored by an earlier request,
+    or the right to execute the request and save() its response."""
+
+    stored: Optional[StoredResponse] = None
+    response: Optional[StoredResponse] = field(default=None, init=False)
+
+    def save(self, response: StoredResponse) -> None:
+        self.response = response
+
+
+def fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        # Length prefixes keep different splits of the same bytes apart
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+
+class IdempotencyStore:
+    """Stores the responses of requests made with an Idempotency-Key.
+
+    A claim inserts the key as pending in a short transaction of its own, and the
+    response is saved to it in a second one once the request is done, so no
+    connection is held while the request runs. A duplicate finding the key
+    pending polls it until the response is saved, then replays it, which holds
+    across all workers. When the first request fails its key is deleted and the
+    next duplicate executes instead. A key left pending by a worker that died is
+    taken over once its pending TTL expires.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ttl: float,
+        pending_ttl: float,
+        wait_timeout: float,
+        poll_interval: float,
+        purge_interval: float,
+    ):
+        self.engine = engine
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        self._purger: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._purger = asyncio.create_task(self._purge_periodically())
+
+    async def stop(self) -> None:
+        if self._purger is not None:
+            self._purger.cancel()
+            await asyncio.gather(self._purger, return_exceptions=True)
+            self._purger = None
+
+    @asynccontextmanager
+    async def claim(self, key: str, request_fingerprint: bytes) -> AsyncIterator[Claim]:
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            claimed_at, stored = await self._try_claim(key, request_fingerprint)
+            if claimed_at is not None or stored is not None:
+                break
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgressError(key)
+            await asyncio.sleep(self.poll_interval)
+
+        if stored is not None:
+            yield Claim(stored=stored)
+            return
+
+        claim = Claim()
+        try:
+            yield claim
+        except BaseException:
+            await self._release(key, claimed_at)
+            raise
+        if claim.response is None:
+            await self._release(key, claimed_at)
+            return
+        await self._save(key, claimed_at, claim.response)
+
+    async def _try_claim(
+        self, key: str, request_fingerprint: bytes
+    ) -> tuple[Optional[datetime], Optional[StoredResponse]]:
+        """Returns the claim's timestamp when the key is claimed, the stored
+        response when it is complete, and neither while it is still pending."""
+        now = datetime.now(timezone.utc)
+        query = (
+            insert(IdempotencyKey)
+            .values(
+                key=key,
+                fingerprint=request_fingerprint,
+                created_at=now,
+                expires_at=now + timedelta(seconds=self.pending_ttl),
+            )
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={
+                    "fingerprint": request_fingerprint,
+                    "status_code": None,
+                    "headers": None,
+                    "body": None,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.pending_ttl),
+                },
+                # An expired key, or a pending one abandoned by a worker that
+                # died, is taken over as if it was new
+                where=IdempotencyKey.expires_at <= now,
+            )
+            .returning(IdempotencyKey.key)
+        )
+        async with self.engine.begin() as connection:
+            if await connection.scalar(query) is not None:
+                return now, None
+            row = (
+                await connection.execute(
+                    select(
+                        IdempotencyKey.fingerprint,
+                        IdempotencyKey.status_code,
+                        IdempotencyKey.headers,
+                        IdempotencyKey.body,
+                    ).where(IdempotencyKey.key == key)
+                )
+            ).one_or_none()
+
+        # The key was released or purged in between, it is claimed next time
+        if row is None:
+            return None, None
+        if row.fingerprint != request_fingerprint:
+            raise IdempotencyKeyMismatchError(key)
+        if row.status_code is None:
+            return None, None
+        return None, StoredResponse(
+            status_code=row.status_code,
+            headers=[
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in row.headers
+            ],
+            body=row.body,
+        )
+
+    @staticmethod
+    def _owned(key: str, claimed_at: datetime) -> list:
+        # A claim that outlived its pending TTL may have been taken over, the
+        # row only belongs to it while it still carries its timestamp
+        return [
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at == claimed_at,
+            IdempotencyKey.status_code.is_(None),
+        ]
+
+    async def _save(
+        self, key: str, claimed_at: datetime, response: StoredResponse
+    ) -> None:
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                update(IdempotencyKey)
+                .where(*self._owned(key, claimed_at))
+                .values(
+                    status_code=response.status_code,
+                    headers=[
+                        (name.decode("latin-1"), value.decode("latin-1"))
+                        for name, value in response.headers
+                    ],
+                    body=response.body,
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                )
+            )
+
+    async def _release(self, key: str, claimed_at: datetime) -> None:
+        async with self.engine.begin() as connection:
+            await connection.execute(
+                delete(IdempotencyKey).where(*self._owned(key, claimed_at))
+            )
+
+    async def purge(self) -> int:
+        async with self.engine.begin() as connection:
+            result = await connection.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+                )
+            )
+        return result.rowcount
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                purged = await self.purge()
+            except Exception as exc:
+                logger.warning(f"Failed to purge expired idempotency keys: {exc}")
+            else:
+                logger.info(f"Purged {purged} expired idempotency keys")
+
+
+idempotency_store = IdempotencyStore(
+    engine,
+    ttl=settings.IDEMPOTENCY_KEY_TTL,
+    pending_ttl=settings.IDEMPOTENCY_PENDING_TTL,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+    poll_interval=settings.IDEMPOTENCY_POLL_INTERVAL,
+    purge_interval=settings.IDEMPOTENCY_PURGE_INTERVAL,
+)
@@ -0,0 +1,85 @@
+import contextvars
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class RequestStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    commits: int = 0
+    checkouts: int = 0
+    # Time pool connections were held, including the time between statements
+    released_connection_time: float = 0.0
+    held_connections: dict[int, float] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def connection_time(self) -> float:
+        now = time.perf_counter()
+        return self.released_connection_time + sum(
+            now - checked_out_at for checked_out_at in self.held_connections.values()
+        )
+
+
+# Set by the instrumentation middleware for the duration of a request, database
+# work outside of a request (startup, background tasks) is not recorded
+request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # Statements on a connection run one at a time, so a single slot is enough
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    stats = request_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_time += time.perf_counter() - conn.info["query_started_at"]
+    stats.rows += max(cursor.rowcount, 0)
+
+
+def _commit(conn):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    stats = request_stats.get()
+    if stats is None:
+        return
+    stats.checkouts += 1
+    stats.held_connections[id(connection_record)] = time.perf_counter()
+    # Kept on the record since the connection may be returned outside the request
+    connection_record.info["request_stats"] = stats
+
+
+def _checkin(dbapi_connection, connection_record):
+    stats = connection_record.info.pop("request_stats", None)
+    if stats is not None:
+        checked_out_at = stats.held_connections.pop(id(connection_record))
+        stats.released_connection_time += time.perf_counter() - checked_out_at
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "commit", _commit)
+    # Pool events registered on the engine carry over to the pool that replaces
+    # the current one on dispose()
+    event.listen(engine.sync_engine, "checkout", _checkout)
+    event.listen(engine.sync_engine, "checkin", _checkin)
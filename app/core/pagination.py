@@ -0,0 +1,18 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, instance_id: uuid.UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(instance_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        created_at, instance_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(created_at), uuid.UUID(instance_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from app.core.metrics import metrics
+
+single_flight_requests = metrics.counter(
+    "single_flight_requests_total",
+    "Coalesced loads by whether the caller ran the load or shared another's",
+    labels=("namespace", "result"),
+)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.finished_at: Optional[float] = None
+        # Known once the load finished, until then any invalidation drops it
+        self.tags: Optional[frozenset[str]] = None
+
+
+class SingleFlight:
+    """Runs one load per key at a time and shares its result with every caller
+    in the same process that asks for the same key while it runs, or up to
+    `window` seconds after. Keys must tell apart loads that may return different
+    results, such as reads from the primary and from a replica.
+
+    Writes must call forget() with the tags they invalidate once they have
+    committed, so that reads started afterwards in this process never join an
+    older load. The flights of other processes are only forgotten once the
+    invalidation reaches them, ResponseCache broadcasts it to every worker.
+    """
+
+    def __init__(self, window: float = 0.0):
+        self.window = window
+        self._flights: dict[str, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Optional[Callable[[Any], Iterable[str]]] = None,
+    ) -> Any:
+        namespace = key.split(":", 1)[0]
+        flight = self._flights.get(key)
+        if flight is not None and not self._is_reusable(flight):
+            flight = None
+
+        if flight is None:
+            single_flight_requests.inc(namespace=namespace, result="leader")
+            flight = _Flight(asyncio.ensure_future(loader()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(
+                lambda task: self._finish(key, flight, task, tags)
+            )
+            try:
+                await asyncio.wait([flight.task])
+            except asyncio.CancelledError:
+                # The load runs on the leader's database session, which is about to
+                # be closed, the callers still waiting start a new load of their own
+                flight.task.cancel()
+                raise
+            return flight.task.result()
+
+        single_flight_requests.inc(namespace=namespace, result="shared")
+        # Waiting instead of awaiting the task keeps a cancelled caller from
+        # cancelling the load for everybody else
+        await asyncio.wait([flight.task])
+        if flight.task.cancelled():
+            return await self.do(key, loader, tags)
+        return flight.task.result()
+
+    def forget(self, tags: Iterable[str]) -> None:
+        """Drops the flights of this process that loaded any of the tags, or
+        haven't finished yet."""
+        tags = frozenset(tags)
+        for key, flight in list(self._flights.items()):
+            if key in tags or flight.tags is None or flight.tags & tags:
+                del self._flights[key]
+
+    def clear(self) -> None:
+        self._flights.clear()
+
+    def _is_reusable(self, flight: _Flight) -> bool:
+        if flight.finished_at is None:
+            return True
+        return time.monotonic() - flight.finished_at < self.window
+
+    def _finish(
+        self,
+        key: str,
+        flight: _Flight,
+        task: asyncio.Task,
+        tags: Optional[Callable[[Any], Iterable[str]]],
+    ) -> None:
+        flight.finished_at = time.monotonic()
+        if task.cancelled() or task.exception() is not None or self.window <= 0:
+            self._discard(key, flight)
+            return
+
+        flight.tags = frozenset(tags(task.result())) if tags else frozenset()
+        asyncio.get_running_loop().call_later(self.window, self._discard, key, flight)
+
+    def _discard(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
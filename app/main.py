@@ -1,17 +1,52 @@
-import logging
-import logging.config
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.endpoints import router
-from app.config.logs.log_config import LOGGING_CONFIG
+from app.api.middleware import (
+    CorrelationIdMiddleware,
+    IdempotencyMiddleware,
+    InstrumentationMiddleware,
+)
+from app.config.logs.log_config import setup_logging
+from app.config.logs.logger import logger
 from app.config.settings import settings
+from app.core.breeds import breed_registry
+from app.core.cache import response_cache
+from app.core.database import engine, replica_engine, warm_up
+from app.core.events import mission_events
+from app.core.idempotency import idempotency_store
+from app.services.assignment import assignment_scheduler
+from app.services.stats import stats_compactor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    engines = {engine, replica_engine}
+    await asyncio.gather(*(warm_up(target_engine) for target_engine in engines))
+    await breed_registry.start()
+    await idempotency_store.start()
+    await response_cache.start()
+    await mission_events.start()
+    await stats_compactor.start()
+    if settings.ASSIGNMENT_ENABLED:
+        await assignment_scheduler.start()
+    logger.info("Application is ready to accept requests")
+    yield
+    await assignment_scheduler.stop()
+    await stats_compactor.stop()
+    await mission_events.stop()
+    await response_cache.stop()
+    await idempotency_store.stop()
+    await breed_registry.stop()
+    for target_engine in engines:
+        await target_engine.dispose()
 
-# Set up logging configuration
-logging.config.dictConfig(LOGGING_CONFIG)
 
-app = FastAPI(title="DevelopersToday Test Task")
+app = FastAPI(title="DevelopersToday Test Task", lifespan=lifespan)
 
 app.include_router(router)
 
@@ -22,3 +57,10 @@ app.add_middleware(
     allow_methods=settings.ALLOWED_METHODS,
     allow_headers=settings.ALLOWED_HEADERS,
 )
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    endpoints={("POST", "/cats/"), ("POST", "/missions/"), ("POST", "/missions/bulk")},
+)
+app.add_middleware(InstrumentationMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
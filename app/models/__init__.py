@@ -1,4 +1,24 @@
 from app.models.cats import Cat
+from app.models.idempotency import IdempotencyKey
 from app.models.missions import Mission, Target
+from app.models.stats import (
+    BreedCatStats,
+    BreedCatStatsDelta,
+    CatMissionStats,
+    CatMissionStatsDelta,
+    CountryTargetStats,
+    CountryTargetStatsDelta,
+)
 
-__all__ = ["Cat", "Mission", "Target"]
+__all__ = [
+    "BreedCatStats",
+    "BreedCatStatsDelta",
+    "Cat",
+    "CatMissionStats",
+    "CatMissionStatsDelta",
+    "CountryTargetStats",
+    "CountryTargetStatsDelta",
+    "IdempotencyKey",
+    "Mission",
+    "Target",
+]
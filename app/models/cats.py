@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String
+from sqlalchemy import Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -6,6 +6,11 @@ from app.models.base import BaseModel
 
 class Cat(BaseModel):
     __tablename__ = "cats"
+    __table_args__ = (
+        Index("ix_cats_created_at_id", "created_at", "id"),
+        Index("ix_cats_breed_created_at_id", "breed", "created_at", "id"),
+        Index("ix_cats_experience", "experience"),
+    )
 
     name: Mapped[str] = mapped_column(String, nullable=False)
     experience: Mapped[int] = mapped_column(Integer, nullable=False)
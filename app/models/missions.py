@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Boolean, ForeignKey, String, Text
+from sqlalchemy import Boolean, ForeignKey, Index, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -8,6 +8,15 @@ from app.models.base import BaseModel
 
 class Target(BaseModel):
     __tablename__ = "targets"
+    __table_args__ = (
+        Index("ix_targets_mission_id", "mission_id"),
+        Index(
+            "ix_targets_mission_id_incomplete",
+            "mission_id",
+            postgresql_where=text("NOT is_completed"),
+        ),
+        Index("ix_targets_country_mission_id", "country", "mission_id"),
+    )
 
     name: Mapped[str] = mapped_column(String, nullable=False)
     country: Mapped[str] = mapped_column(String, nullable=False)
@@ -25,6 +34,29 @@ class Target(BaseModel):
 
 class Mission(BaseModel):
     __tablename__ = "missions"
+    __table_args__ = (
+        Index("ix_missions_cat_id", "cat_id"),
+        Index("ix_missions_created_at_id", "created_at", "id"),
+        Index(
+            "ix_missions_incomplete_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("NOT is_completed"),
+        ),
+        # Backs the "cat has no incomplete mission" anti-join of the assignment
+        # engine
+        Index(
+            "ix_missions_incomplete_cat_id",
+            "cat_id",
+            postgresql_where=text("NOT is_completed"),
+        ),
+        Index(
+            "ix_missions_unassigned_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("cat_id IS NULL AND NOT is_completed"),
+        ),
+    )
 
     cat_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("cats.id"), nullable=True)
     is_completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
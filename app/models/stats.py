@@ -0,0 +1,65 @@
+import uuid
+
+from sqlalchemy import BigInteger, Identity, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# Rollup tables fed by statement-level triggers on cats, missions and targets (see
+# the add_stats_rollups migration). The triggers only append to the *_deltas
+# tables, StatsCompactor folds them into the rollups and reads add up both
+
+# Key of the cat_mission_stats row that counts missions without a cat
+UNASSIGNED_CAT_ID = uuid.UUID(int=0)
+
+
+class CatMissionStats(Base):
+    __tablename__ = "cat_mission_stats"
+
+    cat_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    missions: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_missions: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CountryTargetStats(Base):
+    __tablename__ = "country_target_stats"
+
+    country: Mapped[str] = mapped_column(String, primary_key=True)
+    targets: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_targets: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class BreedCatStats(Base):
+    __tablename__ = "breed_cat_stats"
+
+    breed: Mapped[str] = mapped_column(String, primary_key=True)
+    cats: Mapped[int] = mapped_column(Integer, nullable=False)
+    salary_total: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class CatMissionStatsDelta(Base):
+    __tablename__ = "cat_mission_stats_deltas"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    cat_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    missions: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_missions: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CountryTargetStatsDelta(Base):
+    __tablename__ = "country_target_stats_deltas"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    country: Mapped[str] = mapped_column(String, nullable=False)
+    targets: Mapped[int] = mapped_column(Integer, nullable=False)
+    open_targets: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class BreedCatStatsDelta(Base):
+    __tablename__ = "breed_cat_stats_deltas"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    breed: Mapped[str] = mapped_column(String, nullable=False)
+    cats: Mapped[int] = mapped_column(Integer, nullable=False)
+    salary_total: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -4,6 +4,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import InstanceSchema, PaginationSchema
+
 
 class CatCreateSchema(BaseModel):
     name: str = Field(..., max_length=100)
@@ -12,7 +14,7 @@ class CatCreateSchema(BaseModel):
     salary: int = Field(..., gt=0)
 
 
-class CatSchema(CatCreateSchema):
+class CatSchema(CatCreateSchema, InstanceSchema):
     id: uuid.UUID
     created_at: datetime
     updated_at: datetime
@@ -23,3 +25,21 @@ class CatSchema(CatCreateSchema):
 
 class CatUpdateSchema(BaseModel):
     salary: Optional[int] = Field(None, gt=0)
+
+
+class CatFilterSchema(PaginationSchema):
+    breed: Optional[str] = None
+    min_experience: Optional[int] = Field(None, ge=0)
+    max_experience: Optional[int] = Field(None, ge=0)
+
+
+class CatImportErrorSchema(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class CatImportResultSchema(BaseModel):
+    imported: int
+    rejected: int
+    # Only the first CATS_IMPORT_MAX_ERRORS rejected rows are detailed
+    errors: list[CatImportErrorSchema]
@@ -0,0 +1,35 @@
+import uuid
+from typing import Any, Generic, Optional, Self, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.config.settings import settings
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class InstanceSchema(BaseModel):
+    @classmethod
+    def from_instance(cls, obj: Any) -> Self:
+        # Reads the loaded column values from the instance state in one
+        # pydantic-core call: no attribute instrumentation, no lazy loads, and
+        # the SQLAlchemy state is dropped as an unknown field
+        return cls.model_validate(obj.__dict__)
+
+
+class PaginationSchema(BaseModel):
+    cursor: Optional[str] = None
+    limit: int = Field(
+        settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT
+    )
+
+
+class PageSchema(BaseModel, Generic[SchemaT]):
+    items: list[SchemaT]
+    next_cursor: Optional[str] = None
+
+
+class BatchItemSchema(BaseModel, Generic[SchemaT]):
+    id: uuid.UUID
+    found: bool
+    item: Optional[SchemaT] = None
@@ -0,0 +1,21 @@
+import uuid
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class MissionEventType(str, Enum):
+    MISSION_CREATED = "mission.created"
+    MISSION_UPDATED = "mission.updated"
+    MISSION_DELETED = "mission.deleted"
+    TARGET_UPDATED = "target.updated"
+
+
+class MissionEventSchema(BaseModel):
+    type: MissionEventType
+    mission_id: uuid.UUID
+    target_id: Optional[uuid.UUID] = None
+
+    def payload(self) -> str:
+        return self.model_dump_json(exclude_none=True)
@@ -1,11 +1,14 @@
 import uuid
 from datetime import datetime
+from enum import Enum
 from typing import Optional, Self
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from app.config.settings import settings
 from app.models.missions import Mission
 from app.schemas.cats import CatSchema
+from app.schemas.common import InstanceSchema, PaginationSchema
 
 
 class TargetCreateSchema(BaseModel):
@@ -14,7 +17,7 @@ class TargetCreateSchema(BaseModel):
     mission_id: Optional[uuid.UUID] = None
 
 
-class TargetSchema(TargetCreateSchema):
+class TargetSchema(TargetCreateSchema, InstanceSchema):
     id: uuid.UUID
     notes: Optional[str] = None
     is_completed: bool
@@ -27,11 +30,39 @@ class TargetUpdateSchema(BaseModel):
     is_completed: Optional[bool] = None
 
 
+class TargetBatchUpdateItemSchema(TargetUpdateSchema):
+    id: uuid.UUID
+
+
+class TargetBatchUpdateSchema(BaseModel):
+    targets: list[TargetBatchUpdateItemSchema] = Field(
+        ..., min_length=1, max_length=settings.TARGETS_BATCH_MAX_SIZE
+    )
+
+
+class TargetUpdateStatus(str, Enum):
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    ALREADY_COMPLETED = "already_completed"
+
+
+class TargetBatchResultSchema(BaseModel):
+    id: uuid.UUID
+    status: TargetUpdateStatus
+    target: Optional[TargetSchema] = None
+
+
 class MissionCreateSchema(BaseModel):
     targets: list[TargetCreateSchema]
 
 
-class MissionSchema(BaseModel):
+class MissionBulkCreateSchema(BaseModel):
+    missions: list[MissionCreateSchema] = Field(
+        ..., min_length=1, max_length=settings.MISSIONS_BULK_MAX_SIZE
+    )
+
+
+class MissionSchema(InstanceSchema):
     id: uuid.UUID
     targets: list[TargetSchema]
     cat: Optional[CatSchema] = None
@@ -41,16 +72,21 @@ class MissionSchema(BaseModel):
 
     @classmethod
     def from_instance(cls, obj: Mission) -> Self:
-        return cls(
-            id=obj.id,
-            targets=[TargetSchema(**target.__dict__) for target in obj.targets],
-            cat=CatSchema(**obj.cat.__dict__) if obj.cat else None,
-            is_completed=obj.is_completed,
-            created_at=obj.created_at,
-            updated_at=obj.updated_at,
+        return cls.model_validate(
+            {
+                **obj.__dict__,
+                "targets": [target.__dict__ for target in obj.targets],
+                "cat": obj.cat.__dict__ if obj.cat else None,
+            }
         )
 
 
 class MissionUpdateSchema(BaseModel):
     is_completed: Optional[bool] = None
     cat_id: Optional[uuid.UUID] = None
+
+
+class MissionFilterSchema(PaginationSchema):
+    is_completed: Optional[bool] = None
+    cat_id: Optional[uuid.UUID] = None
+    country: Optional[str] = None
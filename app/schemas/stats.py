@@ -0,0 +1,33 @@
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class MissionTotalsSchema(BaseModel):
+    missions: int
+    completed_missions: int
+    unassigned_missions: int
+    completion_rate: float
+
+
+class CatMissionStatsSchema(BaseModel):
+    cat_id: uuid.UUID
+    name: Optional[str] = None
+    breed: Optional[str] = None
+    missions: int
+    completed_missions: int
+    completion_rate: float
+
+
+class CountryTargetStatsSchema(BaseModel):
+    country: str
+    targets: int
+    open_targets: int
+
+
+class BreedCatStatsSchema(BaseModel):
+    breed: str
+    cats: int
+    salary_total: int
+    average_salary: float
@@ -0,0 +1,82 @@
+"""Production server: python -m app.server [--workers N]
+
+Runs a few checks in the supervisor before any worker is started, then hands
+over to uvicorn's multi-process supervisor. Every worker warms its own pool and
+breed catalogue in the application lifespan before it accepts connections.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+
+import uvicorn
+
+from app.config.logs.log_config import setup_logging
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.breeds import breed_registry
+from app.core.database import engine
+
+
+def default_workers() -> int:
+    # Respects CPU affinity and container cpusets where the platform exposes them
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def is_installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+async def prefork_warmup() -> None:
+    """Fails fast when the database is unreachable and refreshes the breed
+    snapshot once, so that the workers start from the file instead of all
+    calling the breeds API at the same time."""
+    async with engine.connect() as connection:
+        await connection.exec_driver_sql("SELECT 1")
+    await engine.dispose()
+
+    if breed_registry.snapshot_path is not None:
+        await breed_registry.load()
+    else:
+        logger.warning("BREEDS_SNAPSHOT_PATH is unset, every worker loads the breeds")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the production server")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or default_workers()
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(prefork_warmup())
+
+    loop = "uvloop" if is_installed("uvloop") else "asyncio"
+    http = "httptools" if is_installed("httptools") else "h11"
+    logger.info(
+        f"Starting {args.workers} workers on {args.host}:{args.port}"
+        f" (loop={loop}, http={http})"
+    )
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
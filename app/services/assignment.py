@@ -0,0 +1,194 @@
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import Select, column, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.cache import ResponseCache, response_cache, tag
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.models.cats import Cat
+from app.models.missions import Mission
+from app.schemas.events import MissionEventSchema, MissionEventType
+from app.services.base import BaseService
+
+missions_auto_assigned = metrics.counter(
+    "missions_auto_assigned_total", "Missions assigned by the assignment engine"
+)
+assignment_batches = metrics.counter(
+    "assignment_batches_total",
+    "Assignment batches run by the assignment engine",
+    labels=("result",),
+)
+assignment_batch_duration = metrics.histogram(
+    "assignment_batch_duration_seconds", "Time taken by an assignment batch"
+)
+
+
+class AssignmentService(BaseService):
+    """Assigns unassigned missions to available cats, i.e. cats without an
+    incomplete mission, the oldest missions going to the most experienced cats.
+
+    Missions and cats are claimed with FOR NO KEY UPDATE SKIP LOCKED, so any
+    number of engines can run side by side: each one takes rows no other engine
+    holds instead of waiting on them. The lock mode doesn't conflict with the
+    KEY SHARE locks taken by foreign key checks, so targets and missions can
+    still be written while a batch runs.
+    """
+
+    model = Mission
+
+    def __init__(self, session: AsyncSession, cache: ResponseCache):
+        self.session = session
+        self.cache = cache
+
+    @staticmethod
+    def available_cats() -> Select:
+        # OFFSET 0 keeps Postgres from turning NOT EXISTS into an anti-join that
+        # reads every incomplete mission: cats are walked in experience order
+        # instead, each probing ix_missions_incomplete_cat_id, until enough
+        # available ones are found
+        return select(Cat.id).where(
+            ~select(Mission.id)
+            .where(Mission.cat_id == Cat.id, ~Mission.is_completed)
+            .offset(0)
+            .exists()
+        )
+
+    async def assign_batch(self, batch_size: int) -> int:
+        logger.info("Assigning a batch of missions")
+        mission_ids = list(
+            await self.session.scalars(
+                select(Mission.id)
+                .where(Mission.cat_id.is_(None), Mission.is_completed.is_(False))
+                .order_by(Mission.created_at, Mission.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True, key_share=True)
+            )
+        )
+        if not mission_ids:
+            await self.session.rollback()
+            return 0
+
+        locked_cat_ids = list(
+            await self.session.scalars(
+                self.available_cats()
+                .order_by(Cat.experience.desc(), Cat.id)
+                .limit(len(mission_ids))
+                .with_for_update(skip_locked=True, key_share=True)
+            )
+        )
+        # A cat whose lock was released by an engine that just assigned it still
+        # looked available to the locking statement's snapshot, so availability is
+        # checked again now that the locks are held
+        available_ids = set(
+            await self.session.scalars(
+                self.with_ids(self.available_cats(), locked_cat_ids, Cat)
+            )
+        )
+        cat_ids = [cat_id for cat_id in locked_cat_ids if cat_id in available_ids]
+        if not cat_ids:
+            await self.session.rollback()
+            return 0
+
+        assignments = values(
+            column("id", Mission.id.type),
+            column("cat_id", Mission.cat_id.type),
+            name="assignments",
+        ).data(list(zip(mission_ids, cat_ids)))
+        assigned_ids = list(
+            await self.session.scalars(
+                update(Mission)
+                .where(Mission.id == assignments.c.id, Mission.cat_id.is_(None))
+                .values(cat_id=assignments.c.cat_id)
+                .returning(Mission.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.MISSION_UPDATED, mission_id=mission_id
+                )
+                for mission_id in assigned_ids
+            ]
+        )
+        await self.session.commit()
+        await self.cache.invalidate(
+            *(tag("mission", mission_id) for mission_id in assigned_ids),
+            "missions:list",
+        )
+        return len(assigned_ids)
+
+
+class AssignmentScheduler:
+    """Runs assignment batches back to back while they come back full, then
+    waits for the interval before looking for new missions again."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        cache: ResponseCache,
+        batch_size: int,
+        interval: float,
+    ):
+        self.session_maker = session_maker
+        self.cache = cache
+        self.batch_size = batch_size
+        self.interval = interval
+        self._scheduler: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._scheduler = asyncio.create_task(self._assign_periodically())
+
+    async def stop(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+
+    async def run_batch(self) -> int:
+        started = time.perf_counter()
+        try:
+            async with self.session_maker() as session:
+                assigned = await AssignmentService(session, self.cache).assign_batch(
+                    self.batch_size
+                )
+        except Exception:
+            assignment_batches.inc(result="error")
+            raise
+        finally:
+            assignment_batch_duration.observe(time.perf_counter() - started)
+
+        assignment_batches.inc(result="assigned" if assigned else "empty")
+        missions_auto_assigned.inc(assigned)
+        if assigned:
+            logger.info(f"Assigned {assigned} missions")
+        return assigned
+
+    async def run_until_drained(self) -> int:
+        total = 0
+        while True:
+            assigned = await self.run_batch()
+            total += assigned
+            if assigned < self.batch_size:
+                return total
+
+    async def _assign_periodically(self) -> None:
+        while True:
+            try:
+                await self.run_until_drained()
+            except Exception as exc:
+                logger.warning(f"Failed to assign missions: {exc}")
+            await asyncio.sleep(self.interval)
+
+
+assignment_scheduler = AssignmentScheduler(
+    session_maker=async_session_maker,
+    cache=response_cache,
+    batch_size=settings.ASSIGNMENT_BATCH_SIZE,
+    interval=settings.ASSIGNMENT_INTERVAL,
+)
@@ -1,11 +1,16 @@
 from itertools import chain
 from typing import Any, Iterable, Optional, Type
 
+from fastapi import HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy import Select, delete, select, update
+from sqlalchemy import Select, any_, delete, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import Base
+from app.core.events import notify_query
+from app.core.pagination import decode_cursor, encode_cursor
+from app.schemas.events import MissionEventSchema
 
 
 class BaseService:
@@ -14,14 +19,85 @@ class BaseService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def reads_replica(self) -> bool:
+        """Whether the session reads from a replica, whose results are cached
+        apart from the primary's."""
+        return self.session.info.get("replica", False)
+
+    async def release(self) -> None:
+        """Returns the session's connection to the pool once a read is done, so
+        that it isn't held while the result is serialized. The session checks out
+        a connection again if it is used afterwards."""
+        await self.session.close()
+
+    async def notify(self, events: list[MissionEventSchema]) -> None:
+        """Queues events in the current transaction, subscribers only get them
+        once it commits."""
+        if events:
+            await self.session.execute(
+                notify_query([event.payload() for event in events])
+            )
+
     def unpack(self, collection: Iterable) -> list:
         return list(chain.from_iterable(collection))
 
     async def get_all(self, query: Select) -> list[Any]:
         response = await self.session.execute(query)
-        result = self.unpack(response.unique().all())
+        result = self.unpack(response.all())
         return result
 
+    def with_ids(
+        self, query: Select, instance_ids: list[Any], model: Type[Base] = None
+    ) -> Select:
+        # "id = ANY($1)" binds a single array, so the statement is the same for any
+        # number of ids and stays in the prepared statement cache
+        model_instance = model or self.model
+        return query.where(
+            model_instance.id
+            == any_(literal(instance_ids, ARRAY(model_instance.id.type)))
+        )
+
+    def keyset(
+        self,
+        query: Select,
+        limit: int,
+        cursor: Optional[str] = None,
+        model: Type[Base] = None,
+    ) -> Select:
+        # Fetches one extra row to tell whether there is a next page
+        model_instance = model or self.model
+        if cursor:
+            try:
+                created_at, instance_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor",
+                )
+            query = query.where(
+                tuple_(model_instance.created_at, model_instance.id)
+                > tuple_(created_at, instance_id)
+            )
+
+        return query.order_by(model_instance.created_at, model_instance.id).limit(
+            limit + 1
+        )
+
+    async def paginate(
+        self,
+        query: Select,
+        limit: int,
+        cursor: Optional[str] = None,
+        model: Type[Base] = None,
+    ) -> tuple[list[Any], Optional[str]]:
+        result = await self.get_all(self.keyset(query, limit, cursor, model))
+        if len(result) <= limit:
+            return result, None
+
+        result = result[:limit]
+        return result, encode_cursor(result[-1].created_at, result[-1].id)
+
     async def create(
         self, model_data: Type[BaseModel], model: Type[Base] = None
     ) -> Type[Base]:
@@ -32,6 +108,21 @@ class BaseService:
         await self.session.commit()
         return new_instance
 
+    async def insert_many(
+        self, values: list[dict[str, Any]], model: Type[Base] = None
+    ) -> list[Base]:
+        # Executed as one executemany: the statement compiles once whatever the
+        # number of rows and comes from the compiled cache afterwards, so the
+        # connection isn't held while a statement sized to this batch is built.
+        # SQLAlchemy still sends the rows as multi-row INSERT ... RETURNING
+        # batches. Committing is up to the caller
+        model_instance = model or self.model
+        query = insert(model_instance).returning(
+            model_instance, sort_by_parameter_order=True
+        )
+        result = await self.session.scalars(query, values)
+        return list(result.all())
+
     async def get_instance(self, query: Select) -> Optional[Base]:
         response = await self.session.execute(query)
         result = response.unique().scalar_one_or_none()
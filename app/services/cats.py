@@ -1,57 +1,174 @@
 import uuid
 from typing import Optional
 
-import httpx
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.config.logs.logger import logger
+from app.core.breeds import BreedCatalogueUnavailableError, BreedRegistry
+from app.core.cache import ResponseCache, tag
+from app.core.etag import make_etag
 from app.models.cats import Cat
-from app.schemas.cats import CatCreateSchema, CatSchema, CatUpdateSchema
+from app.schemas.cats import (
+    CatCreateSchema,
+    CatFilterSchema,
+    CatSchema,
+    CatUpdateSchema,
+)
+from app.schemas.common import BatchItemSchema, PageSchema
 from app.services.base import BaseService
 
 
 class CatService(BaseService):
     model = Cat
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        breed_registry: BreedRegistry,
+        cache: ResponseCache,
+    ):
         self.session = session
-
-    async def get_cats(self) -> list[CatSchema]:
-        logger.info("Getting all cats")
-        cats_data = await self.get_all(select(Cat))
-        return [CatSchema(**cat.__dict__) for cat in cats_data]
+        self.breed_registry = breed_registry
+        self.cache = cache
+
+    async def get_cats(self, filters: CatFilterSchema) -> PageSchema[CatSchema]:
+        logger.info("Getting a page of cats")
+        return await self.cache.get_or_load(
+            f"cats:page:{filters.model_dump_json()}",
+            lambda: self._get_cats_page(filters),
+            tags=lambda page: [
+                "cats:list",
+                *(tag("cat", cat.id) for cat in page.items),
+            ],
+            replica=self.reads_replica,
+        )
 
     async def get_cat(self, cat_id: uuid.UUID) -> CatSchema:
         logger.info("Getting a cat by id")
+        return await self.cache.get_or_load(
+            tag("cat", cat_id),
+            lambda: self._get_cat(cat_id),
+            tags=lambda cat: [tag("cat", cat.id)],
+            replica=self.reads_replica,
+        )
+
+    async def get_cats_by_ids(
+        self, cat_ids: list[uuid.UUID]
+    ) -> list[BatchItemSchema[CatSchema]]:
+        logger.info("Getting cats by ids")
+        cats = await self.cache.get_many_or_load(
+            {cat_id: tag("cat", cat_id) for cat_id in cat_ids},
+            self._get_cats_by_ids,
+            tags=lambda cat: [tag("cat", cat.id)],
+            replica=self.reads_replica,
+        )
+        return [
+            BatchItemSchema[CatSchema](
+                id=cat_id, found=cat_id in cats, item=cats.get(cat_id)
+            )
+            for cat_id in cat_ids
+        ]
+
+    @staticmethod
+    def cat_etag(cat: CatSchema) -> str:
+        return make_etag([(cat.id, cat.updated_at)])
+
+    @staticmethod
+    def cats_etag(page: PageSchema[CatSchema]) -> str:
+        return make_etag(
+            [
+                *((cat.id, cat.updated_at) for cat in page.items),
+                ("next", page.next_cursor is not None),
+            ]
+        )
+
+    async def get_cat_etag(self, cat_id: uuid.UUID) -> Optional[str]:
+        response = await self.session.execute(
+            select(Cat.id, Cat.updated_at).where(Cat.id == cat_id)
+        )
+        row = response.one_or_none()
+        await self.release()
+        return make_etag([tuple(row)]) if row else None
+
+    async def get_cats_etag(self, filters: CatFilterSchema) -> str:
+        query = self.keyset(
+            self._cats_query(filters).with_only_columns(Cat.id, Cat.updated_at),
+            filters.limit,
+            filters.cursor,
+        )
+        rows = (await self.session.execute(query)).all()
+        await self.release()
+        return make_etag(
+            [
+                *(tuple(row) for row in rows[: filters.limit]),
+                ("next", len(rows) > filters.limit),
+            ]
+        )
+
+    def _cats_query(self, filters: CatFilterSchema) -> Select:
+        query = select(Cat)
+        if filters.breed is not None:
+            query = query.where(Cat.breed == filters.breed)
+        if filters.min_experience is not None:
+            query = query.where(Cat.experience >= filters.min_experience)
+        if filters.max_experience is not None:
+            query = query.where(Cat.experience <= filters.max_experience)
+        return query
+
+    async def _get_cats_page(self, filters: CatFilterSchema) -> PageSchema[CatSchema]:
+        cats_data, next_cursor = await self.paginate(
+            self._cats_query(filters), filters.limit, filters.cursor
+        )
+        await self.release()
+        return PageSchema[CatSchema].model_construct(
+            items=[CatSchema.from_instance(cat) for cat in cats_data],
+            next_cursor=next_cursor,
+        )
+
+    async def _get_cat(self, cat_id: uuid.UUID) -> CatSchema:
         cat_instance: Optional[Cat] = await self.get_instance(
             select(Cat).where(Cat.id == cat_id)
         )
+        await self.release()
         if not cat_instance:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Cat not found",
             )
-        return CatSchema(**cat_instance.__dict__)
+        return CatSchema.from_instance(cat_instance)
+
+    async def _get_cats_by_ids(
+        self, cat_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, CatSchema]:
+        cats = await self.get_all(self.with_ids(select(Cat), cat_ids))
+        await self.release()
+        return {cat.id: CatSchema.from_instance(cat) for cat in cats}
 
     async def create_cat(self, cat_data: CatCreateSchema) -> CatSchema:
         logger.info("Creating a new cat")
 
         logger.info("Validating the cat's breed")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://api.thecatapi.com/v1/breeds")
-            existing_breeds = [breed["name"] for breed in response.json()]
-            if cat_data.breed not in existing_breeds:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid breed provided",
-                )
+        try:
+            breed = await self.breed_registry.resolve(cat_data.breed)
+        except BreedCatalogueUnavailableError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Breed catalogue is unavailable",
+            )
+        if breed is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid breed provided",
+            )
 
+        cat_data.breed = breed
         new_cat = await self.create(cat_data)
-        return CatSchema(**new_cat.__dict__)
+        await self.cache.invalidate("cats:list")
+        return CatSchema.from_instance(new_cat)
 
     async def update_cat(
         self, cat_id: uuid.UUID, cat_data: CatUpdateSchema
@@ -65,7 +182,9 @@ class CatService(BaseService):
             )
 
         updated_cat = await self.update(cat_id, cat_data)
-        return CatSchema(**updated_cat.__dict__)
+        # Missions embed their cat, so their entries carry the cat's tag as well
+        await self.cache.invalidate(tag("cat", cat_id))
+        return CatSchema.from_instance(updated_cat)
 
     async def delete_cat(self, cat_id: uuid.UUID) -> None:
         logger.info("Deleting a cat")
@@ -85,3 +204,4 @@ class CatService(BaseService):
             )
 
         await self.delete(cat_id)
+        await self.cache.invalidate(tag("cat", cat_id), "cats:list")
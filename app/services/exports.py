@@ -0,0 +1,77 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence, Type
+
+from pydantic_core import to_json
+from sqlalchemy import RowMapping, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.database import Base
+from app.models.cats import Cat
+from app.models.missions import Mission, Target
+from app.schemas.exports import ExportFormat
+
+
+class ExportService:
+    # Export responses outlive the request-scoped session, so the service opens its
+    # own session for the lifetime of the stream
+    def __init__(self, session_maker: async_sessionmaker):
+        self.session_maker = session_maker
+
+    def export_cats(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        logger.info("Exporting cats")
+        return self.export(Cat, export_format)
+
+    def export_missions(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        logger.info("Exporting missions")
+        return self.export(Mission, export_format)
+
+    def export_targets(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        logger.info("Exporting targets")
+        return self.export(Target, export_format)
+
+    async def export(
+        self, model: Type[Base], export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        columns = [column.name for column in model.__table__.columns]
+        if export_format == ExportFormat.CSV:
+            yield self.encode_csv([columns])
+
+        async for rows in self.stream_rows(model):
+            if export_format == ExportFormat.CSV:
+                yield self.encode_csv(
+                    [
+                        [self._csv_value(row[column]) for column in columns]
+                        for row in rows
+                    ]
+                )
+            else:
+                yield self.encode_ndjson(rows)
+
+    async def stream_rows(
+        self, model: Type[Base]
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        query = select(model.__table__).execution_options(
+            yield_per=settings.EXPORT_CHUNK_SIZE
+        )
+        async with self.session_maker() as session:
+            result = await session.stream(query)
+            async for partition in result.mappings().partitions():
+                yield partition
+
+    @staticmethod
+    def encode_ndjson(rows: Sequence[RowMapping]) -> bytes:
+        return b"".join(to_json(dict(row)) + b"\n" for row in rows)
+
+    @staticmethod
+    def encode_csv(rows: list[list[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def _csv_value(value: Any) -> Any:
+        return value.isoformat() if isinstance(value, datetime) else value
@@ -0,0 +1,237 @@
+import codecs
+import csv
+import io
+import tempfile
+from typing import IO, Any, AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import column, func, insert, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.breeds import BreedCatalogueUnavailableError, BreedRegistry
+from app.core.cache import ResponseCache
+from app.models.cats import Cat
+from app.schemas.cats import (
+    CatCreateSchema,
+    CatImportErrorSchema,
+    CatImportResultSchema,
+)
+from app.schemas.exports import ExportFormat
+from app.services.base import BaseService
+
+CSV_COLUMNS = ("name", "breed", "experience", "salary")
+STAGING_TABLE = "cats_import"
+# Encoded rows are written to the spool in blocks of about this many characters
+SPOOL_WRITE_SIZE = 64 * 1024
+
+
+def split_records(text: str, quoted: bool) -> tuple[list[str], str]:
+    """Splits complete records off the text and returns them with the remainder.
+    With quoted set, a line break inside a quoted CSV field doesn't end the
+    record: quotes are escaped by doubling, so a record is complete once it
+    holds an even number of them."""
+    lines = text.split("\n")
+    remainder = lines.pop()
+    if not quoted:
+        return lines, remainder
+
+    records, record = [], ""
+    for line in lines:
+        record += line + "\n"
+        if record.count('"') % 2 == 0:
+            records.append(record)
+            record = ""
+    return records, record + remainder
+
+
+async def iter_records(
+    body: AsyncIterator[bytes], quoted: bool
+) -> AsyncIterator[list[str]]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in body:
+            records, pending = split_records(pending + decoder.decode(chunk), quoted)
+            if records:
+                yield records
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload must be UTF-8 encoded",
+        )
+    if pending.strip():
+        yield [pending]
+
+
+def format_errors(exc: ValidationError) -> list[str]:
+    return [
+        (
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            if error["loc"]
+            else error["msg"]
+        )
+        for error in exc.errors(include_url=False)
+    ]
+
+
+class ImportService(BaseService):
+    """Loads uploads of cats while they are received. Rows are validated one by
+    one, and the valid ones are spooled to a temporary file, kept in memory up to
+    CATS_IMPORT_SPOOL_MEMORY bytes, so neither the upload nor the rows are ever
+    held in memory whole.
+
+    No connection is checked out until the upload has been read to the end, the
+    client sets its pace. The spool is then copied into a temporary table and
+    moved to cats with a single INSERT ... SELECT, in one short transaction: an
+    upload that fails partway imports nothing and can be sent again as it is.
+    """
+
+    model = Cat
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        breed_registry: BreedRegistry,
+        cache: ResponseCache,
+    ):
+        self.session = session
+        self.breed_registry = breed_registry
+        self.cache = cache
+
+    async def import_cats(
+        self, body: AsyncIterator[bytes], import_format: ExportFormat
+    ) -> CatImportResultSchema:
+        logger.info("Importing cats")
+        result = CatImportResultSchema(imported=0, rejected=0, errors=[])
+        breeds: dict[str, Optional[str]] = {}
+        row_number = 0
+
+        with tempfile.SpooledTemporaryFile(
+            max_size=settings.CATS_IMPORT_SPOOL_MEMORY
+        ) as spool:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            async for row_number, data in self._iter_rows(body, import_format):
+                try:
+                    cat = (
+                        CatCreateSchema.model_validate_json(data)
+                        if isinstance(data, str)
+                        else CatCreateSchema.model_validate(data)
+                    )
+                except ValidationError as exc:
+                    self._reject(result, row_number, format_errors(exc))
+                    continue
+
+                if cat.breed not in breeds:
+                    breeds[cat.breed] = await self._resolve_breed(cat.breed)
+                breed = breeds[cat.breed]
+                if breed is None:
+                    self._reject(result, row_number, ["breed: Invalid breed provided"])
+                    continue
+
+                writer.writerow((cat.name, breed, cat.experience, cat.salary))
+                result.imported += 1
+                if buffer.tell() >= SPOOL_WRITE_SIZE:
+                    spool.write(buffer.getvalue().encode())
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            spool.write(buffer.getvalue().encode())
+            if result.imported:
+                spool.seek(0)
+                await self._load(spool)
+        logger.info(
+            f"Imported {result.imported} cats, rejected {result.rejected}"
+            f" of {row_number} rows"
+        )
+        return result
+
+    async def _iter_rows(
+        self, body: AsyncIterator[bytes], import_format: ExportFormat
+    ) -> AsyncIterator[tuple[int, Any]]:
+        # NDJSON lines are validated straight from JSON, CSV rows as dicts. Row
+        # numbers count data rows, blank ones included, from 1
+        quoted = import_format == ExportFormat.CSV
+        header: Optional[list[str]] = None
+        row_number = 0
+        async for records in iter_records(body, quoted):
+            if not quoted:
+                for record in records:
+                    row_number += 1
+                    if record.strip():
+                        yield row_number, record
+                continue
+
+            for values in csv.reader(records):
+                if header is None:
+                    header = self._check_header(values)
+                    continue
+                row_number += 1
+                if values:
+                    yield row_number, dict(zip(header, values))
+
+    @staticmethod
+    def _check_header(header: list[str]) -> list[str]:
+        header = [column.strip() for column in header]
+        missing = [column for column in CSV_COLUMNS if column not in header]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV header is missing columns: {', '.join(missing)}",
+            )
+        return header
+
+    async def _resolve_breed(self, name: str) -> Optional[str]:
+        try:
+            return await self.breed_registry.resolve(name)
+        except BreedCatalogueUnavailableError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Breed catalogue is unavailable",
+            )
+
+    @staticmethod
+    def _reject(
+        result: CatImportResultSchema, row_number: int, errors: list[str]
+    ) -> None:
+        result.rejected += 1
+        if len(result.errors) < settings.CATS_IMPORT_MAX_ERRORS:
+            result.errors.append(CatImportErrorSchema(row=row_number, errors=errors))
+
+    async def _load(self, spool: IO[bytes]) -> None:
+        # Creating the staging table through the session opens its transaction,
+        # the COPY then runs in it on the session's asyncpg connection, as
+        # SQLAlchemy doesn't expose COPY. Ids and timestamps are filled in by
+        # the INSERT ... SELECT, which also fires the statement triggers on cats
+        # once for the whole upload
+        await self.session.execute(
+            text(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} ON COMMIT DROP AS"
+                f" SELECT {', '.join(CSV_COLUMNS)} FROM {Cat.__tablename__}"
+                " WITH NO DATA"
+            )
+        )
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_to_table(
+            STAGING_TABLE,
+            source=spool,
+            columns=CSV_COLUMNS,
+            format="csv",
+            # Unquoted empty fields would be read as NULL
+            force_not_null=("name", "breed"),
+        )
+        staging = table(STAGING_TABLE, *(column(name) for name in CSV_COLUMNS))
+        now = func.now()
+        await self.session.execute(
+            insert(Cat).from_select(
+                ["id", "created_at", "updated_at", *CSV_COLUMNS],
+                select(func.gen_random_uuid(), now, now, *staging.c),
+            )
+        )
+        await self.session.commit()
+        await self.cache.invalidate("cats:list")
@@ -1,115 +1,358 @@
 import uuid
+from collections import defaultdict
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import (
+    Boolean,
+    Select,
+    and_,
+    cast,
+    column,
+    func,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.config.logs.logger import logger
+from app.core.cache import ResponseCache, tag
+from app.core.etag import make_etag
 from app.models.cats import Cat
 from app.models.missions import Mission, Target
+from app.schemas.common import BatchItemSchema, PageSchema
+from app.schemas.events import MissionEventSchema, MissionEventType
 from app.schemas.missions import (
     MissionCreateSchema,
+    MissionFilterSchema,
     MissionSchema,
     MissionUpdateSchema,
-    TargetCreateSchema,
+    TargetBatchResultSchema,
+    TargetBatchUpdateItemSchema,
     TargetSchema,
     TargetUpdateSchema,
+    TargetUpdateStatus,
 )
 from app.services.base import BaseService
 
+# Targets and cats are fetched with one batched "WHERE ... IN" query each instead of
+# being joined onto every mission row
+MISSION_RELATIONS = (selectinload(Mission.cat), selectinload(Mission.targets))
+
 
 class MissionService(BaseService):
     model = Mission
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: ResponseCache):
         self.session = session
+        self.cache = cache
 
-    async def get_missions(self) -> list[MissionSchema]:
-        logger.info("Getting all missions")
-        missions_data = await self.get_all(
-            select(Mission).options(
-                joinedload(Mission.cat), joinedload(Mission.targets)
-            )
+    @staticmethod
+    def cache_tags(mission: MissionSchema) -> list[str]:
+        tags = [tag("mission", mission.id)]
+        if mission.cat:
+            tags.append(tag("cat", mission.cat.id))
+        return tags
+
+    async def get_missions(
+        self, filters: MissionFilterSchema
+    ) -> PageSchema[MissionSchema]:
+        logger.info("Getting a page of missions")
+        return await self.cache.get_or_load(
+            f"missions:page:{filters.model_dump_json()}",
+            lambda: self._get_missions_page(filters),
+            tags=lambda page: [
+                "missions:list",
+                *(
+                    entry_tag
+                    for mission in page.items
+                    for entry_tag in self.cache_tags(mission)
+                ),
+            ],
+            replica=self.reads_replica,
         )
-        return [MissionSchema.from_instance(mission) for mission in missions_data]
 
     async def get_mission(self, mission_id: uuid.UUID) -> MissionSchema:
         logger.info("Getting a mission by id")
-        mission = await self.get_instance(
-            select(Mission)
-            .where(Mission.id == mission_id)
-            .options(joinedload(Mission.cat), joinedload(Mission.targets))
+        return await self.cache.get_or_load(
+            tag("mission", mission_id),
+            lambda: self._get_mission(mission_id),
+            tags=self.cache_tags,
+            replica=self.reads_replica,
         )
-        return MissionSchema.from_instance(mission)
 
-    async def create_mission(self, mission_data: MissionCreateSchema) -> None:
-        logger.info("Creating a mission")
-        mission_targets: list[TargetCreateSchema] = mission_data.targets
-        if len(mission_targets) > 3:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mission targets quantity must be from 1 to 3",
+    async def get_missions_by_ids(
+        self, mission_ids: list[uuid.UUID]
+    ) -> list[BatchItemSchema[MissionSchema]]:
+        logger.info("Getting missions by ids")
+        missions = await self.cache.get_many_or_load(
+            {mission_id: tag("mission", mission_id) for mission_id in mission_ids},
+            self._get_missions_by_ids,
+            tags=self.cache_tags,
+            replica=self.reads_replica,
+        )
+        return [
+            BatchItemSchema[MissionSchema](
+                id=mission_id,
+                found=mission_id in missions,
+                item=missions.get(mission_id),
             )
+            for mission_id in mission_ids
+        ]
 
-        mission_data.targets = []
-        mission: Mission = await self.create(mission_data)
+    @staticmethod
+    def mission_version(mission: MissionSchema) -> tuple:
+        return (
+            mission.id,
+            mission.updated_at,
+            mission.cat.id if mission.cat else None,
+            mission.cat.updated_at if mission.cat else None,
+            max((target.updated_at for target in mission.targets), default=None),
+        )
 
-        logger.info("Creating targets for a mission")
-        for target in mission_targets:
-            target.mission_id = mission.id
-            await self.create(target, Target)
+    def mission_etag(self, mission: MissionSchema) -> str:
+        return make_etag([self.mission_version(mission)])
 
-    async def update_mission(
-        self, mission_id: uuid.UUID, mission_data: MissionUpdateSchema
-    ) -> MissionSchema:
-        logger.info("Updating a mission")
+    def missions_etag(self, page: PageSchema[MissionSchema]) -> str:
+        return make_etag(
+            [
+                *(self.mission_version(mission) for mission in page.items),
+                ("next", page.next_cursor is not None),
+            ]
+        )
+
+    async def get_mission_etag(self, mission_id: uuid.UUID) -> Optional[str]:
+        response = await self.session.execute(
+            self._versions_query(select(Mission).where(Mission.id == mission_id))
+        )
+        row = response.one_or_none()
+        await self.release()
+        return make_etag([tuple(row)]) if row else None
+
+    async def get_missions_etag(self, filters: MissionFilterSchema) -> str:
+        query = self.keyset(
+            self._versions_query(self._missions_query(filters)),
+            filters.limit,
+            filters.cursor,
+        )
+        rows = (await self.session.execute(query)).all()
+        await self.release()
+        return make_etag(
+            [
+                *(tuple(row) for row in rows[: filters.limit]),
+                ("next", len(rows) > filters.limit),
+            ]
+        )
+
+    def _versions_query(self, query: Select) -> Select:
+        # Same columns as mission_version, without loading the object graph
+        targets_updated_at = (
+            select(func.max(Target.updated_at))
+            .where(Target.mission_id == Mission.id)
+            .scalar_subquery()
+        )
+        return query.with_only_columns(
+            Mission.id,
+            Mission.updated_at,
+            Mission.cat_id,
+            Cat.updated_at,
+            targets_updated_at,
+        ).outerjoin(Cat, Cat.id == Mission.cat_id)
+
+    def _missions_query(self, filters: MissionFilterSchema) -> Select:
+        query = select(Mission)
+        if filters.is_completed is not None:
+            query = query.where(Mission.is_completed == filters.is_completed)
+        if filters.cat_id is not None:
+            query = query.where(Mission.cat_id == filters.cat_id)
+        if filters.country is not None:
+            query = query.where(Mission.targets.any(Target.country == filters.country))
+        return query
+
+    async def _get_missions_page(
+        self, filters: MissionFilterSchema
+    ) -> PageSchema[MissionSchema]:
+        query = self._missions_query(filters).options(*MISSION_RELATIONS)
+        missions_data, next_cursor = await self.paginate(
+            query, filters.limit, filters.cursor
+        )
+        await self.release()
+        return PageSchema[MissionSchema].model_construct(
+            items=[MissionSchema.from_instance(mission) for mission in missions_data],
+            next_cursor=next_cursor,
+        )
+
+    async def _get_mission(self, mission_id: uuid.UUID) -> MissionSchema:
         mission: Optional[Mission] = await self.get_instance(
-            select(Mission)
-            .where(Mission.id == mission_id)
-            .options(joinedload(Mission.targets))
+            select(Mission).where(Mission.id == mission_id).options(*MISSION_RELATIONS)
         )
+        await self.release()
         if not mission:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Mission not found"
             )
+        return MissionSchema.from_instance(mission)
 
-        logger.info("Checking if the mission is already completed")
-        if mission.is_completed and mission_data.is_completed is not None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Mission already completed",
-            )
+    async def _get_missions_by_ids(
+        self, mission_ids: list[uuid.UUID]
+    ) -> dict[uuid.UUID, MissionSchema]:
+        missions = await self.get_all(
+            self.with_ids(select(Mission), mission_ids).options(*MISSION_RELATIONS)
+        )
+        await self.release()
+        return {
+            mission.id: MissionSchema.from_instance(mission) for mission in missions
+        }
 
-        logger.info("Checking if the cat is already assigned to the mission")
-        if mission_data.cat_id:
-            if mission.cat_id:
+    async def create_mission(self, mission_data: MissionCreateSchema) -> MissionSchema:
+        logger.info("Creating a mission")
+        missions = await self.create_missions([mission_data])
+        return missions[0]
+
+    async def create_missions(
+        self, missions_data: list[MissionCreateSchema]
+    ) -> list[MissionSchema]:
+        logger.info("Creating missions in bulk")
+        for mission_data in missions_data:
+            if len(mission_data.targets) > 3:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Mission cat already assigned",
+                    detail="Mission targets quantity must be from 1 to 3",
                 )
-            cat = await self.get_instance(
-                select(Cat).where(Cat.id == mission_data.cat_id)
-            )
-            if not cat:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="Cat not found"
+
+        mission_ids = [uuid.uuid4() for _ in missions_data]
+        missions: list[Mission] = await self.insert_many(
+            [{"id": mission_id} for mission_id in mission_ids]
+        )
+
+        logger.info("Creating targets for the missions")
+        target_rows = [
+            {**target.model_dump(exclude={"mission_id"}), "mission_id": mission_id}
+            for mission_id, mission_data in zip(mission_ids, missions_data)
+            for target in mission_data.targets
+        ]
+        targets: list[Target] = (
+            await self.insert_many(target_rows, Target) if target_rows else []
+        )
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.MISSION_CREATED, mission_id=mission_id
                 )
+                for mission_id in mission_ids
+            ]
+        )
+        await self.session.commit()
+        await self.cache.invalidate("missions:list")
+
+        targets_by_mission: dict[uuid.UUID, list[Target]] = defaultdict(list)
+        for target in targets:
+            targets_by_mission[target.mission_id].append(target)
+        missions_by_id = {mission.id: mission for mission in missions}
+
+        result = []
+        for mission_id in mission_ids:
+            mission = missions_by_id[mission_id]
+            set_committed_value(mission, "targets", targets_by_mission[mission_id])
+            set_committed_value(mission, "cat", None)
+            result.append(MissionSchema.from_instance(mission))
+        return result
+
+    async def update_mission(
+        self, mission_id: uuid.UUID, mission_data: MissionUpdateSchema
+    ) -> MissionSchema:
+        logger.info("Updating a mission")
+        values = mission_data.model_dump(exclude_none=True)
+        # The business rules are part of the UPDATE itself, so concurrent requests
+        # can't both pass a check made before the write
+        query = update(Mission).where(Mission.id == mission_id)
+        if mission_data.is_completed is not None:
+            query = query.where(Mission.is_completed.is_(False))
+        if mission_data.cat_id:
+            query = query.where(
+                Mission.cat_id.is_(None),
+                select(Cat.id).where(Cat.id == mission_data.cat_id).exists(),
+            )
+
+        try:
+            updated_id = await self.session.scalar(
+                query.values(values).returning(Mission.id)
+                if values
+                else select(Mission.id).where(Mission.id == mission_id)
+            )
+        except IntegrityError:
+            # The cat was deleted between the EXISTS check and the foreign key check
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Cat not found"
+            )
+        if updated_id is None:
+            await self.session.rollback()
+            await self._raise_update_error(mission_id, mission_data)
 
-        logger.info("Updating the mission targets in case of completion")
         if mission_data.is_completed:
-            for target in mission.targets:
-                target.is_completed = True
-                await self.save(target)
+            logger.info("Completing the mission targets")
+            await self.session.execute(
+                update(Target)
+                .where(Target.mission_id == mission_id, Target.is_completed.is_(False))
+                .values(is_completed=True)
+            )
 
-        await self.update(mission_id, mission_data)
-        refreshed_mission = await self.get_instance(
-            select(Mission)
-            .where(Mission.id == mission_id)
-            .options(joinedload(Mission.cat), joinedload(Mission.targets))
+        updated_mission = await self.get_instance(
+            select(Mission).where(Mission.id == mission_id).options(*MISSION_RELATIONS)
+        )
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.MISSION_UPDATED, mission_id=mission_id
+                )
+            ]
+        )
+        await self.session.commit()
+        await self.cache.invalidate(tag("mission", mission_id), "missions:list")
+        return MissionSchema.from_instance(updated_mission)
+
+    async def _raise_update_error(
+        self, mission_id: uuid.UUID, mission_data: MissionUpdateSchema
+    ) -> None:
+        logger.info("Checking why the mission wasn't updated")
+        response = await self.session.execute(
+            select(
+                Mission.is_completed,
+                Mission.cat_id,
+                select(Cat.id).where(Cat.id == mission_data.cat_id).exists(),
+            ).where(Mission.id == mission_id)
+        )
+        row = response.one_or_none()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Mission not found"
+            )
+
+        is_completed, cat_id, cat_exists = row
+        if is_completed and mission_data.is_completed is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Mission already completed",
+            )
+        if mission_data.cat_id and cat_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Mission cat already assigned",
+            )
+        if mission_data.cat_id and not cat_exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Cat not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Mission was modified concurrently, retry the request",
         )
-        return MissionSchema.from_instance(refreshed_mission)
 
     async def delete_mission(self, mission_id: uuid.UUID) -> None:
         logger.info("Deleting a mission")
@@ -127,7 +370,15 @@ class MissionService(BaseService):
                 detail="Mission cat already assigned",
             )
 
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.MISSION_DELETED, mission_id=mission_id
+                )
+            ]
+        )
         await self.delete(mission_id)
+        await self.cache.invalidate(tag("mission", mission_id), "missions:list")
 
     async def update_target(
         self, target_id: uuid.UUID, target_data: TargetUpdateSchema
@@ -151,5 +402,110 @@ class MissionService(BaseService):
                 detail="Target already completed",
             )
 
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.TARGET_UPDATED,
+                    mission_id=target.mission_id,
+                    target_id=target_id,
+                )
+            ]
+        )
         refreshed_target = await self.update(target_id, target_data, Target)
-        return TargetSchema(**refreshed_target.__dict__)
+        await self.cache.invalidate(tag("mission", refreshed_target.mission_id))
+        return TargetSchema.from_instance(refreshed_target)
+
+    async def update_targets(
+        self, targets_data: list[TargetBatchUpdateItemSchema]
+    ) -> list[TargetBatchResultSchema]:
+        logger.info("Updating targets in batch")
+        target_ids = [target_data.id for target_data in targets_data]
+        if len(set(target_ids)) != len(target_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Target ids must be unique",
+            )
+
+        # Concurrent batches sharing targets would deadlock if each locked its rows
+        # in join order, so the rows are locked by id first. The ids found here
+        # also tell missing targets from completed ones afterwards
+        existing_ids = set(
+            await self.session.scalars(
+                self.with_ids(select(Target.id), target_ids, Target)
+                .order_by(Target.id)
+                .with_for_update()
+            )
+        )
+
+        changes = values(
+            column("id", Target.id.type),
+            column("notes", Target.notes.type),
+            column("is_completed", Target.is_completed.type),
+            name="changes",
+        ).data(
+            [
+                (target_data.id, target_data.notes, target_data.is_completed)
+                for target_data in targets_data
+            ]
+        )
+        # A column holding only NULLs is rendered as untyped NULL literals
+        is_completed = cast(changes.c.is_completed, Boolean)
+        # Same rule as update_target: a completed target only accepts no-op changes
+        query = (
+            update(Target)
+            .where(
+                Target.id == changes.c.id,
+                or_(
+                    Target.is_completed.is_(False),
+                    and_(
+                        is_completed.is_(None),
+                        func.coalesce(changes.c.notes, "") == "",
+                    ),
+                ),
+            )
+            .values(
+                notes=func.coalesce(changes.c.notes, Target.notes),
+                is_completed=func.coalesce(is_completed, Target.is_completed),
+            )
+            .returning(Target)
+            .execution_options(synchronize_session=False)
+        )
+        updated = {target.id: target for target in await self.session.scalars(query)}
+        await self.notify(
+            [
+                MissionEventSchema(
+                    type=MissionEventType.TARGET_UPDATED,
+                    mission_id=target.mission_id,
+                    target_id=target.id,
+                )
+                for target in updated.values()
+            ]
+        )
+        await self.session.commit()
+        await self.cache.invalidate(
+            *{tag("mission", target.mission_id) for target in updated.values()}
+        )
+
+        results = []
+        for target_id in target_ids:
+            if target_id in updated:
+                results.append(
+                    TargetBatchResultSchema(
+                        id=target_id,
+                        status=TargetUpdateStatus.UPDATED,
+                        target=TargetSchema.from_instance(updated[target_id]),
+                    )
+                )
+            elif target_id in existing_ids:
+                results.append(
+                    TargetBatchResultSchema(
+                        id=target_id, status=TargetUpdateStatus.ALREADY_COMPLETED
+                    )
+                )
+            else:
+                results.append(
+                    TargetBatchResultSchema(
+                        id=target_id, status=TargetUpdateStatus.NOT_FOUND
+                    )
+                )
+        return results
@@ -0,0 +1,226 @@
+import asyncio
+from typing import Optional, Type
+
+from sqlalchemy import Insert, Subquery, cast, delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.logs.logger import logger
+from app.config.settings import settings
+from app.core.database import Base, async_session_maker
+from app.models.cats import Cat
+from app.models.stats import (
+    UNASSIGNED_CAT_ID,
+    BreedCatStats,
+    BreedCatStatsDelta,
+    CatMissionStats,
+    CatMissionStatsDelta,
+    CountryTargetStats,
+    CountryTargetStatsDelta,
+)
+from app.schemas.stats import (
+    BreedCatStatsSchema,
+    CatMissionStatsSchema,
+    CountryTargetStatsSchema,
+    MissionTotalsSchema,
+)
+from app.services.base import BaseService
+
+# (rollup, deltas, key, counters)
+ROLLUPS: tuple[tuple[Type[Base], Type[Base], str, tuple[str, ...]], ...] = (
+    (
+        CatMissionStats,
+        CatMissionStatsDelta,
+        "cat_id",
+        ("missions", "completed_missions"),
+    ),
+    (
+        CountryTargetStats,
+        CountryTargetStatsDelta,
+        "country",
+        ("targets", "open_targets"),
+    ),
+    (BreedCatStats, BreedCatStatsDelta, "breed", ("cats", "salary_total")),
+)
+
+
+def rate(part: int, total: int) -> float:
+    return round(part / total, 4) if total else 0.0
+
+
+def current_stats(
+    rollup: Type[Base], deltas: Type[Base], key: str, counters: tuple[str, ...]
+) -> Subquery:
+    """The rollup with the deltas not folded into it yet added up, by key."""
+    rows = union_all(
+        select(*(getattr(rollup, name) for name in (key, *counters))),
+        select(*(getattr(deltas, name) for name in (key, *counters))),
+    ).subquery()
+    return (
+        select(
+            rows.c[key],
+            *(
+                cast(func.sum(rows.c[name]), getattr(rollup, name).type).label(name)
+                for name in counters
+            ),
+        )
+        .group_by(rows.c[key])
+        .subquery(rollup.__tablename__)
+    )
+
+
+def compaction(
+    rollup: Type[Base], deltas: Type[Base], key: str, counters: tuple[str, ...]
+) -> Insert:
+    """Moves every delta into the rollup in one statement. A delta deleted by a
+    concurrent compaction is skipped, so none is ever counted twice."""
+    moved = (
+        delete(deltas)
+        .returning(*(getattr(deltas, name) for name in (key, *counters)))
+        .cte("moved")
+    )
+    query = insert(rollup).from_select(
+        [key, *counters],
+        select(moved.c[key], *(func.sum(moved.c[name]) for name in counters))
+        .group_by(moved.c[key])
+        .order_by(moved.c[key]),
+    )
+    return query.on_conflict_do_update(
+        index_elements=[key],
+        set_={name: getattr(rollup, name) + query.excluded[name] for name in counters},
+    ).add_cte(moved)
+
+
+class StatsService(BaseService):
+    """Reads the rollup tables, so every query costs O(groups) plus the deltas
+    not compacted yet, instead of scanning cats, missions or targets."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_mission_totals(self) -> MissionTotalsSchema:
+        logger.info("Getting mission totals")
+        stats = current_stats(*ROLLUPS[0])
+        row = (
+            await self.session.execute(
+                select(
+                    func.coalesce(func.sum(stats.c.missions), 0),
+                    func.coalesce(func.sum(stats.c.completed_missions), 0),
+                    func.coalesce(
+                        func.sum(stats.c.missions).filter(
+                            stats.c.cat_id == UNASSIGNED_CAT_ID
+                        ),
+                        0,
+                    ),
+                )
+            )
+        ).one()
+        await self.release()
+        missions, completed_missions, unassigned_missions = row
+        return MissionTotalsSchema(
+            missions=missions,
+            completed_missions=completed_missions,
+            unassigned_missions=unassigned_missions,
+            completion_rate=rate(completed_missions, missions),
+        )
+
+    async def get_missions_by_cat(self, limit: int) -> list[CatMissionStatsSchema]:
+        logger.info("Getting mission stats by cat")
+        stats = current_stats(*ROLLUPS[0])
+        query = (
+            select(stats, Cat.name, Cat.breed)
+            .join(Cat, Cat.id == stats.c.cat_id)
+            .where(stats.c.missions > 0)
+            .order_by(stats.c.missions.desc(), stats.c.cat_id.desc())
+            .limit(limit)
+        )
+        rows = (await self.session.execute(query)).all()
+        await self.release()
+        return [
+            CatMissionStatsSchema(
+                cat_id=row.cat_id,
+                name=row.name,
+                breed=row.breed,
+                missions=row.missions,
+                completed_missions=row.completed_missions,
+                completion_rate=rate(row.completed_missions, row.missions),
+            )
+            for row in rows
+        ]
+
+    async def get_targets_by_country(self) -> list[CountryTargetStatsSchema]:
+        logger.info("Getting target stats by country")
+        stats = current_stats(*ROLLUPS[1])
+        query = (
+            select(stats)
+            .where(stats.c.targets > 0)
+            .order_by(stats.c.open_targets.desc(), stats.c.country)
+        )
+        rows = (await self.session.execute(query)).all()
+        await self.release()
+        return [
+            CountryTargetStatsSchema(
+                country=row.country,
+                targets=row.targets,
+                open_targets=row.open_targets,
+            )
+            for row in rows
+        ]
+
+    async def get_cats_by_breed(self) -> list[BreedCatStatsSchema]:
+        logger.info("Getting cat stats by breed")
+        stats = current_stats(*ROLLUPS[2])
+        query = (
+            select(stats)
+            .where(stats.c.cats > 0)
+            .order_by(stats.c.salary_total.desc(), stats.c.breed)
+        )
+        rows = (await self.session.execute(query)).all()
+        await self.release()
+        return [
+            BreedCatStatsSchema(
+                breed=row.breed,
+                cats=row.cats,
+                salary_total=row.salary_total,
+                average_salary=round(row.salary_total / row.cats, 2),
+            )
+            for row in rows
+        ]
+
+
+class StatsCompactor:
+    """Folds the deltas appended by writers into the rollups every interval, in
+    one short transaction, so that reads only add up the recent ones."""
+
+    def __init__(self, session_maker: async_sessionmaker, interval: float):
+        self.session_maker = session_maker
+        self.interval = interval
+        self._compactor: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._compactor = asyncio.create_task(self._compact_periodically())
+
+    async def stop(self) -> None:
+        if self._compactor is not None:
+            self._compactor.cancel()
+            await asyncio.gather(self._compactor, return_exceptions=True)
+            self._compactor = None
+
+    async def compact(self) -> None:
+        async with self.session_maker() as session:
+            for rollup in ROLLUPS:
+                await session.execute(compaction(*rollup))
+            await session.commit()
+
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.compact()
+            except Exception as exc:
+                logger.warning(f"Failed to compact the stats rollups: {exc}")
+
+
+stats_compactor = StatsCompactor(
+    session_maker=async_session_maker, interval=settings.STATS_COMPACTION_INTERVAL
+)
@@ -0,0 +1,19 @@
+"""Local stand-in for TheCatAPI breeds endpoint.
+
+Serves the benchmark breeds so that a server under load never calls the real
+API:
+
+    uvicorn benchmarks.breeds_stub:app --port 8081
+    BREEDS_API_URL=http://127.0.0.1:8081/v1/breeds python -m app.server
+"""
+
+from fastapi import FastAPI
+
+from benchmarks.seed import BREEDS
+
+app = FastAPI(title="Breeds stub")
+
+
+@app.get("/v1/breeds")
+async def get_breeds() -> list[dict[str, str]]:
+    return [{"id": breed[:4].lower(), "name": breed} for breed in BREEDS]
@@ -0,0 +1,115 @@
+"""Measures POST /cats/import throughput.
+
+Uploads --rows generated cats in each format, a share of them invalid, as a
+chunked stream and checks the report: every valid row imported, every invalid
+one rejected with its row number. Runs in-process unless --url is given.
+
+    python -m benchmarks.cat_import --rows 100000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+from typing import AsyncIterator, Iterator
+
+import httpx
+
+from app.core.breeds import StaticBreedSource, breed_registry
+from app.main import app
+from benchmarks.seed import BREEDS
+
+INVALID_EVERY = 50
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def generate_cats(rows: int) -> Iterator[tuple[dict, bool]]:
+    for index in range(rows):
+        cat = {
+            "name": f'Imported "cat" {index}',
+            "breed": BREEDS[index % len(BREEDS)].lower(),
+            "experience": index % 20 + 1,
+            "salary": 1000 + index,
+        }
+        if index % INVALID_EVERY == 0:
+            cat["breed"] = "Dragon"
+        elif index % INVALID_EVERY == 1:
+            cat["salary"] = -1
+        yield cat, index % INVALID_EVERY > 1
+
+
+def encode(rows: int, import_format: str) -> tuple[bytes, set[int]]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=["name", "breed", "experience", "salary"]
+    )
+    if import_format == "csv":
+        writer.writeheader()
+    invalid_rows = set()
+    for row_number, (cat, valid) in enumerate(generate_cats(rows), start=1):
+        if not valid:
+            invalid_rows.add(row_number)
+        if import_format == "csv":
+            writer.writerow(cat)
+        else:
+            buffer.write(json.dumps(cat) + "\n")
+    return buffer.getvalue().encode(), invalid_rows
+
+
+async def stream(body: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), UPLOAD_CHUNK_SIZE):
+        yield body[start : start + UPLOAD_CHUNK_SIZE]
+
+
+async def run(client: httpx.AsyncClient, rows: int, import_format: str) -> bool:
+    body, invalid_rows = encode(rows, import_format)
+    started = time.perf_counter()
+    response = await client.post(
+        "/cats/import", params={"format": import_format}, content=stream(body)
+    )
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    report = response.json()
+
+    passed = (
+        report["imported"] == rows - len(invalid_rows)
+        and report["rejected"] == len(invalid_rows)
+        and all(error["row"] in invalid_rows for error in report["errors"])
+    )
+    print(
+        f"{'ok  ' if passed else 'FAIL'} {import_format}: {rows} rows"
+        f" ({len(body) / 1e6:.1f}MB) in {elapsed:.2f}s, {rows / elapsed:,.0f} rows/s,"
+        f" {report['imported']} imported, {report['rejected']} rejected"
+    )
+    return passed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--formats", nargs="+", default=["ndjson", "csv"])
+    args = parser.parse_args()
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+            results = [await run(client, args.rows, fmt) for fmt in args.formats]
+        return 0 if all(results) else 1
+
+    breed_registry.source = StaticBreedSource(BREEDS)
+    breed_registry.snapshot_path = None
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            timeout=None,
+        ) as client:
+            results = [await run(client, args.rows, fmt) for fmt in args.formats]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,104 @@
+"""Measures the fan-out of GET /missions/events to many clients.
+
+Opens --clients streams against a running server, publishes --events
+notifications straight to the channel and reports how long it took until every
+client received every event. Run the server with a single worker so all the
+clients share one listener:
+
+    python -m benchmarks.events --url http://localhost:8000 --clients 2000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+from app.core.database import engine
+from app.core.events import MISSION_EVENTS_CHANNEL, notify_query
+
+
+async def consume(
+    client: httpx.AsyncClient,
+    events: int,
+    connected: asyncio.Semaphore,
+    received_at: list[float],
+) -> int:
+    received = 0
+    async with client.stream("GET", "/missions/events") as response:
+        response.raise_for_status()
+        connected.release()
+        async for line in response.aiter_lines():
+            if line.startswith("event: resync"):
+                continue
+            if line.startswith("event:"):
+                received += 1
+                if received == events:
+                    received_at.append(time.perf_counter())
+                    return received
+    return received
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=None, limits=limits
+    ) as client:
+        connected = asyncio.Semaphore(0)
+        received_at: list[float] = []
+        consumers = [
+            asyncio.create_task(consume(client, args.events, connected, received_at))
+            for _ in range(args.clients)
+        ]
+        for _ in range(args.clients):
+            await connected.acquire()
+        # Streams are registered once their first chunk is awaited
+        await asyncio.sleep(0.5)
+
+        payloads = [
+            json.dumps({"type": "benchmark", "mission_id": str(uuid.uuid4())})
+            for _ in range(args.events)
+        ]
+        started = time.perf_counter()
+        async with engine.begin() as connection:
+            await connection.execute(notify_query(payloads, MISSION_EVENTS_CHANNEL))
+        done, pending = await asyncio.wait(consumers, timeout=args.timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    await engine.dispose()
+
+    delivered = sum(task.result() for task in done if not task.exception())
+    latencies = sorted(at - started for at in received_at)
+    print(
+        json.dumps(
+            {
+                "clients": args.clients,
+                "events": args.events,
+                "delivered": delivered,
+                "expected": args.clients * args.events,
+                "complete_clients": len(latencies),
+                "p50_ms": (
+                    round(statistics.median(latencies) * 1000, 2) if latencies else None
+                ),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+            },
+            indent=2,
+        )
+    )
+    return 0 if len(latencies) == args.clients else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
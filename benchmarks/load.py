@@ -0,0 +1,227 @@
+"""HTTP load test for every API route.
+
+Runs each scenario from benchmarks.scenarios for a fixed duration with a
+number of concurrent clients and writes latency percentiles, throughput, SQL
+statements and connection hold time per request (read from the Server-Timing
+header) to a JSON report meant to be diffed between commits.
+
+In-process, through the ASGI app with the breeds API replaced by a static list:
+
+    python -m benchmarks.load --seed-cats 1000 --seed-missions 10000 \\
+        --output report.json
+
+Against a local server, with the breeds API replaced by benchmarks.breeds_stub:
+
+    uvicorn benchmarks.breeds_stub:app --port 8081 &
+    BREEDS_API_URL=http://127.0.0.1:8081/v1/breeds python -m app.server &
+    python -m benchmarks.load --url http://127.0.0.1:8000 --output report.json
+
+Throughput is measured on the wall clock, so it includes the untimed setup
+requests of scenarios such as DELETE /cats/{cat_id}.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import DATABASE_URL
+from benchmarks.scenarios import SCENARIOS, Samples, Scenario, collect_samples
+from benchmarks.seed import BREEDS, seed, truncate
+
+STATEMENTS = re.compile(r'desc="(\d+) statements"')
+CONNECTION_TIME = re.compile(r"pool;dur=([\d.]+)")
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.asynccontextmanager
+async def open_client(url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from app.core.breeds import StaticBreedSource, breed_registry
+    from app.main import app
+
+    # A snapshot left by another run could hold a different catalogue
+    breed_registry.source = StaticBreedSource(BREEDS)
+    breed_registry.snapshot_path = None
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            # Unhandled errors are counted as 500 responses instead of ending the run
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://benchmark",
+            timeout=30,
+        ) as client:
+            yield client
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    samples: Samples,
+    concurrency: int,
+    duration: float,
+) -> dict:
+    latencies: list[float] = []
+    statements: list[int] = []
+    connection_times: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request = await scenario.prepare(client, samples)
+            started_at = time.perf_counter()
+            try:
+                response = await client.send(request)
+                await response.aread()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+            server_timing = response.headers.get("Server-Timing", "")
+            match = STATEMENTS.search(server_timing)
+            if match:
+                statements.append(int(match.group(1)))
+            match = CONNECTION_TIME.search(server_timing)
+            if match:
+                connection_times.append(float(match.group(1)))
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "statements": round(statistics.fmean(statements), 2) if statements else None,
+        "connection_ms": (
+            round(statistics.fmean(connection_times), 2) if connection_times else None
+        ),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Server URL, in-process if unset")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    # Seeding truncates the tables first
+    parser.add_argument("--seed-cats", type=int, default=0)
+    parser.add_argument("--seed-missions", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=None,
+        help="Substrings of scenario names, every default scenario if unset",
+    )
+    parser.add_argument("--output", default=None, help="JSON report path")
+    args = parser.parse_args()
+
+    random.seed(args.random_seed)
+    if args.seed_cats or args.seed_missions:
+        engine = create_async_engine(args.database_url)
+        try:
+            await truncate(engine)
+            counts = await seed(
+                engine,
+                args.seed_cats,
+                args.seed_missions,
+                random_seed=args.random_seed,
+            )
+            print("Seeded " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+        finally:
+            await engine.dispose()
+
+    if args.scenarios:
+        scenarios = [
+            scenario
+            for scenario in SCENARIOS
+            if any(name in scenario.name for name in args.scenarios)
+        ]
+    else:
+        scenarios = [scenario for scenario in SCENARIOS if scenario.default]
+
+    results = {}
+    async with open_client(args.url) as client:
+        samples = await collect_samples(client)
+        for scenario in scenarios:
+            if args.warmup > 0:
+                await run_scenario(
+                    client, scenario, samples, args.concurrency, args.warmup
+                )
+            result = await run_scenario(
+                client, scenario, samples, args.concurrency, args.duration
+            )
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<48} {result.get('rps', 0):>8} rps"
+                f"  p50 {result.get('p50_ms', '-'):>8} ms"
+                f"  p95 {result.get('p95_ms', '-'):>8} ms"
+                f"  p99 {result.get('p99_ms', '-'):>8} ms"
+                f"  {result.get('statements')} statements"
+                f"  {result.get('connection_ms')} ms held"
+                f"  {result['errors']} errors"
+            )
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "target": args.url or "in-process",
+            "params": {
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "seed_cats": args.seed_cats,
+                "seed_missions": args.seed_missions,
+            },
+            "scenarios": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Compares joined and selectin loading of mission cats and targets.
+
+For every page size the same missions are loaded with both strategies, and the
+statements issued, rows and column values transferred from Postgres and the
+latency are reported.
+
+    python -m benchmarks.mission_loaders --seed-cats 20000 --seed-missions 50000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload
+
+from app.core.database import DATABASE_URL
+from app.models.missions import Mission
+from app.services.missions import MISSION_RELATIONS
+from benchmarks.seed import seed, truncate
+
+STRATEGIES = {
+    "joined": (joinedload(Mission.cat), joinedload(Mission.targets)),
+    "selectin": MISSION_RELATIONS,
+}
+
+
+class RowCounter:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements = 0
+        self.rows = 0
+        self.values = 0
+
+    def __enter__(self) -> "RowCounter":
+        event.listen(self.engine.sync_engine, "after_cursor_execute", self.count)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        event.remove(self.engine.sync_engine, "after_cursor_execute", self.count)
+
+    def count(self, conn, cursor, statement, parameters, context, many) -> None:
+        self.statements += 1
+        rows = max(cursor.rowcount, 0)
+        self.rows += rows
+        # Joined rows repeat the mission and cat columns for every target
+        self.values += rows * len(cursor.description or ())
+
+
+async def load_page(
+    session_maker: async_sessionmaker, strategy: str, limit: int
+) -> list[Mission]:
+    async with session_maker() as session:
+        query = (
+            select(Mission)
+            .options(*STRATEGIES[strategy])
+            .order_by(Mission.created_at, Mission.id)
+            .limit(limit)
+        )
+        result = await session.scalars(query)
+        if strategy == "joined":
+            result = result.unique()
+        return result.all()
+
+
+async def measure(
+    engine: AsyncEngine,
+    session_maker: async_sessionmaker,
+    strategy: str,
+    limit: int,
+    repeat: int,
+) -> dict[str, Any]:
+    # One warm-up round so connection setup and statement preparation are excluded
+    await load_page(session_maker, strategy, limit)
+
+    timings = []
+    with RowCounter(engine) as counter:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            missions = await load_page(session_maker, strategy, limit)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "missions": len(missions),
+        "statements": counter.statements // repeat,
+        "rows": counter.rows // repeat,
+        "values": counter.values // repeat,
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[max(int(len(timings) * 0.95) - 1, 0)],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--seed-cats", type=int, default=0)
+    parser.add_argument("--seed-missions", type=int, default=0)
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        if args.seed_cats or args.seed_missions:
+            await truncate(engine)
+            await seed(engine, args.seed_cats, args.seed_missions, random_seed=0)
+
+        print(
+            f"{'limit':>6} {'strategy':>9} {'missions':>9} {'statements':>11}"
+            f" {'rows':>7} {'values':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        )
+        for limit in args.limits:
+            for strategy in STRATEGIES:
+                result = await measure(
+                    engine, session_maker, strategy, limit, args.repeat
+                )
+                print(
+                    f"{limit:>6} {strategy:>9} {result['missions']:>9}"
+                    f" {result['statements']:>11} {result['rows']:>7}"
+                    f" {result['values']:>8}"
+                    f" {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
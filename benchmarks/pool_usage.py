@@ -0,0 +1,132 @@
+"""Checks how long each route holds pool connections.
+
+Runs every scenario from benchmarks.scenarios one request at a time through the
+ASGI app and reads pool checkouts, connection hold time and DB time from the
+Server-Timing header. A route fails when it holds connections for more than
+--max-idle-ms beyond the time its statements took in a tenth of its requests or
+more, a single slow request (a garbage collection, a scheduling hiccup) isn't a
+connection held on purpose. Also checks that POST /cats/ doesn't hold one while
+the breed catalogue is fetched.
+
+    python -m benchmarks.pool_usage --requests 20
+"""
+
+import argparse
+import asyncio
+import re
+import statistics
+import sys
+from typing import Optional
+
+import httpx
+
+from app.api.dependencies.breeds import get_breed_registry
+from app.core.breeds import (
+    BreedRegistry,
+    BreedSource,
+    StaticBreedSource,
+    breed_registry,
+)
+from app.main import app
+from benchmarks.scenarios import SCENARIOS, collect_samples, new_cat
+from benchmarks.seed import BREEDS
+
+SERVER_TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) \w+")?')
+
+
+class SlowBreedSource(BreedSource):
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def fetch(self) -> list[str]:
+        await asyncio.sleep(self.delay)
+        return BREEDS
+
+
+def parse_timing(response: httpx.Response) -> dict[str, tuple[float, Optional[int]]]:
+    return {
+        name: (float(duration), int(count) if count else None)
+        for name, duration, count in SERVER_TIMING.findall(
+            response.headers.get("Server-Timing", "")
+        )
+    }
+
+
+def check(name: str, passed: bool, detail: str) -> bool:
+    print(f"{'ok  ' if passed else 'FAIL'} {name}: {detail}")
+    return passed
+
+
+async def check_routes(
+    client: httpx.AsyncClient, requests: int, max_idle_ms: float
+) -> list[bool]:
+    samples = await collect_samples(client)
+    results = []
+    for scenario in SCENARIOS:
+        if not scenario.default:
+            continue
+        checkouts, idle = [], []
+        for _ in range(requests):
+            response = await client.send(await scenario.prepare(client, samples))
+            timing = parse_timing(response)
+            if "pool" not in timing:
+                continue
+            (pool_ms, count), (db_ms, _) = timing["pool"], timing["db"]
+            checkouts.append(count)
+            idle.append(pool_ms - db_ms)
+        if not idle:
+            continue
+        worst = max(idle)
+        slowest_tenth = statistics.quantiles(idle, n=10)[-1] if len(idle) > 1 else worst
+        results.append(
+            check(
+                scenario.name,
+                slowest_tenth <= max_idle_ms,
+                f"{statistics.fmean(checkouts):.1f} checkouts,"
+                f" held {statistics.median(idle):.1f}ms"
+                f" (p90 {slowest_tenth:.1f}ms, max {worst:.1f}ms)"
+                " beyond DB time",
+            )
+        )
+    return results
+
+
+async def check_breed_fetch(client: httpx.AsyncClient, delay: float) -> bool:
+    # An empty catalogue makes every request fetch it from the slow source
+    registry = BreedRegistry(SlowBreedSource(delay), ttl=0)
+    app.dependency_overrides[get_breed_registry] = lambda: registry
+    try:
+        response = await client.post("/cats/", json=new_cat())
+    finally:
+        app.dependency_overrides.pop(get_breed_registry)
+    pool_ms, _ = parse_timing(response)["pool"]
+    return check(
+        "POST /cats/ with a breed fetch",
+        response.status_code == 201 and pool_ms < delay * 1000,
+        f"{response.status_code}, held {pool_ms:.1f}ms"
+        f" during a {delay * 1000:.0f}ms fetch",
+    )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--max-idle-ms", type=float, default=25.0)
+    parser.add_argument("--breed-fetch-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    breed_registry.source = StaticBreedSource(BREEDS)
+    breed_registry.snapshot_path = None
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            results = [
+                *await check_routes(client, args.requests, args.max_idle_ms),
+                await check_breed_fetch(client, args.breed_fetch_delay),
+            ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
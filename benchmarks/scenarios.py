@@ -0,0 +1,220 @@
+"""One scenario per route in app/api/routes.
+
+A scenario prepares the request it measures. Setup requests it needs (e.g.
+creating the cat that is then deleted) are sent while preparing and are not
+part of the measurement.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from benchmarks.seed import BREEDS, COUNTRIES
+
+Samples = dict[str, list[Any]]
+Prepare = Callable[[httpx.AsyncClient, Samples], Awaitable[httpx.Request]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    prepare: Prepare
+    # Exports and other heavy scenarios only run when selected explicitly
+    default: bool = True
+
+
+def pick(samples: Samples, key: str) -> Any:
+    return random.choice(samples[key])
+
+
+def new_cat() -> dict[str, Any]:
+    return {
+        "name": "Benchmark",
+        "breed": random.choice(BREEDS),
+        "experience": random.randint(1, 20),
+        "salary": random.randint(500, 5000),
+    }
+
+
+def new_mission() -> dict[str, Any]:
+    return {
+        "targets": [
+            {"name": f"Target {index}", "country": random.choice(COUNTRIES)}
+            for index in range(random.randint(1, 3))
+        ]
+    }
+
+
+async def created(client: httpx.AsyncClient, url: str, payload: dict) -> dict:
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+def request(method: str, url: str, **kwargs: Any) -> Prepare:
+    async def prepare(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+        return client.build_request(method, url, **kwargs)
+
+    return prepare
+
+
+def get_cat(etag: bool = False) -> Prepare:
+    async def prepare(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+        cat = pick(samples, "cats")
+        headers = {"If-None-Match": cat["etag"]} if etag else {}
+        return client.build_request("GET", f"/cats/{cat['id']}", headers=headers)
+
+    return prepare
+
+
+def get_mission(etag: bool = False) -> Prepare:
+    async def prepare(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+        mission = pick(samples, "missions")
+        headers = {"If-None-Match": mission["etag"]} if etag else {}
+        return client.build_request(
+            "GET", f"/missions/{mission['id']}", headers=headers
+        )
+
+    return prepare
+
+
+async def get_cats_batch(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    ids = [cat["id"] for cat in random.sample(samples["cats"], 20)]
+    return client.build_request("GET", "/cats/batch", params={"ids": ids})
+
+
+async def get_missions_batch(
+    client: httpx.AsyncClient, samples: Samples
+) -> httpx.Request:
+    ids = [mission["id"] for mission in random.sample(samples["missions"], 20)]
+    return client.build_request("GET", "/missions/batch", params={"ids": ids})
+
+
+async def create_cat(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    return client.build_request("POST", "/cats/", json=new_cat())
+
+
+async def update_cat(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    cat = pick(samples, "cats")
+    return client.build_request(
+        "PATCH", f"/cats/{cat['id']}", json={"salary": random.randint(500, 5000)}
+    )
+
+
+async def delete_cat(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    cat = await created(client, "/cats/", new_cat())
+    return client.build_request("DELETE", f"/cats/{cat['id']}")
+
+
+async def create_mission(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    return client.build_request("POST", "/missions/", json=new_mission())
+
+
+async def create_missions_bulk(
+    client: httpx.AsyncClient, samples: Samples
+) -> httpx.Request:
+    return client.build_request(
+        "POST", "/missions/bulk", json={"missions": [new_mission() for _ in range(20)]}
+    )
+
+
+async def complete_mission(
+    client: httpx.AsyncClient, samples: Samples
+) -> httpx.Request:
+    mission = await created(client, "/missions/", new_mission())
+    return client.build_request(
+        "PATCH",
+        f"/missions/{mission['id']}",
+        json={"cat_id": pick(samples, "cats")["id"], "is_completed": True},
+    )
+
+
+async def delete_mission(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    mission = await created(client, "/missions/", new_mission())
+    return client.build_request("DELETE", f"/missions/{mission['id']}")
+
+
+async def update_target(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    return client.build_request(
+        "PATCH",
+        f"/missions/mission/target/{pick(samples, 'targets')}",
+        json={"notes": "benchmark"},
+    )
+
+
+async def update_targets(client: httpx.AsyncClient, samples: Samples) -> httpx.Request:
+    targets = random.sample(samples["targets"], min(20, len(samples["targets"])))
+    return client.build_request(
+        "PATCH",
+        "/missions/targets",
+        json={"targets": [{"id": target, "notes": "benchmark"} for target in targets]},
+    )
+
+
+SCENARIOS = [
+    Scenario("GET /cats/", request("GET", "/cats/")),
+    Scenario("GET /cats/?breed", request("GET", "/cats/", params={"breed": BREEDS[0]})),
+    Scenario("GET /cats/batch", get_cats_batch),
+    Scenario("GET /cats/{cat_id}", get_cat()),
+    Scenario("GET /cats/{cat_id} (If-None-Match)", get_cat(etag=True)),
+    Scenario("POST /cats/", create_cat),
+    Scenario("PATCH /cats/{cat_id}", update_cat),
+    Scenario("DELETE /cats/{cat_id}", delete_cat),
+    Scenario("GET /cats/export", request("GET", "/cats/export"), default=False),
+    Scenario("GET /missions/", request("GET", "/missions/")),
+    Scenario(
+        "GET /missions/?is_completed",
+        request("GET", "/missions/", params={"is_completed": "false"}),
+    ),
+    Scenario("GET /missions/batch", get_missions_batch),
+    Scenario("GET /missions/{mission_id}", get_mission()),
+    Scenario("GET /missions/{mission_id} (If-None-Match)", get_mission(etag=True)),
+    Scenario("POST /missions/", create_mission),
+    Scenario("POST /missions/bulk", create_missions_bulk),
+    Scenario("PATCH /missions/{mission_id}", complete_mission),
+    Scenario("DELETE /missions/{mission_id}", delete_mission),
+    Scenario("PATCH /missions/mission/target/{target_id}", update_target),
+    Scenario("PATCH /missions/targets", update_targets),
+    Scenario("GET /missions/export", request("GET", "/missions/export"), default=False),
+    Scenario(
+        "GET /missions/targets/export",
+        request("GET", "/missions/targets/export"),
+        default=False,
+    ),
+    Scenario("GET /stats/missions", request("GET", "/stats/missions")),
+    Scenario("GET /stats/missions/by-cat", request("GET", "/stats/missions/by-cat")),
+    Scenario(
+        "GET /stats/targets/by-country", request("GET", "/stats/targets/by-country")
+    ),
+    Scenario("GET /stats/cats/by-breed", request("GET", "/stats/cats/by-breed")),
+    Scenario("GET /metrics", request("GET", "/metrics")),
+]
+
+
+async def collect_samples(client: httpx.AsyncClient, size: int = 200) -> Samples:
+    cats = await client.get("/cats/", params={"limit": size})
+    missions = await client.get(
+        "/missions/", params={"limit": size, "is_completed": "false"}
+    )
+    cats.raise_for_status()
+    missions.raise_for_status()
+
+    samples: Samples = {"cats": [], "missions": [], "targets": []}
+    for cat in cats.json()["items"]:
+        response = await client.get(f"/cats/{cat['id']}")
+        samples["cats"].append({"id": cat["id"], "etag": response.headers["ETag"]})
+    for mission in missions.json()["items"]:
+        response = await client.get(f"/missions/{mission['id']}")
+        samples["missions"].append(
+            {"id": mission["id"], "etag": response.headers["ETag"]}
+        )
+        samples["targets"].extend(
+            target["id"] for target in mission["targets"] if not target["is_completed"]
+        )
+    if not all(samples.values()):
+        raise SystemExit(
+            "The database has no data, run with --seed-cats/--seed-missions"
+        )
+    return samples
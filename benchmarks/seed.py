@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.database import DATABASE_URL
+from app.models.cats import Cat
+from app.models.missions import Mission, Target
+
+BREEDS = [
+    "Abyssinian",
+    "Bengal",
+    "British Shorthair",
+    "Maine Coon",
+    "Norwegian Forest Cat",
+    "Persian",
+    "Ragdoll",
+    "Siamese",
+    "Sphynx",
+    "Turkish Angora",
+]
+COUNTRIES = ["Ukraine", "Poland", "Germany", "France", "Spain", "Italy", "Japan"]
+
+
+async def truncate(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(text("TRUNCATE targets, missions, cats"))
+
+
+async def seed(
+    engine: AsyncEngine,
+    cats: int,
+    missions: int,
+    batch_size: int = 5000,
+    random_seed: Optional[int] = None,
+) -> dict[str, int]:
+    """Bulk inserts `cats` cats and `missions` missions with 1-3 targets each.
+
+    A third of the missions are left unassigned and a fifth are completed,
+    timestamps are spread over the last year.
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc)
+
+    def timestamp() -> datetime:
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    cat_rows = []
+    for index in range(cats):
+        created_at = timestamp()
+        cat_rows.append(
+            {
+                "id": uuid.uuid4(),
+                "name": f"Cat {index}",
+                "breed": rng.choice(BREEDS),
+                "experience": rng.randint(1, 20),
+                "salary": rng.randint(500, 5000),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+
+    mission_rows, target_rows = [], []
+    for _ in range(missions):
+        created_at = timestamp()
+        is_completed = rng.random() < 0.2
+        mission_id = uuid.uuid4()
+        mission_rows.append(
+            {
+                "id": mission_id,
+                "cat_id": (
+                    rng.choice(cat_rows)["id"]
+                    if cat_rows and rng.random() > 0.33
+                    else None
+                ),
+                "is_completed": is_completed,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+        for index in range(rng.randint(1, 3)):
+            target_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "mission_id": mission_id,
+                    "name": f"Target {index}",
+                    "country": rng.choice(COUNTRIES),
+                    "notes": None,
+                    "is_completed": is_completed,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+
+    async with engine.begin() as connection:
+        for model, rows in (
+            (Cat, cat_rows),
+            (Mission, mission_rows),
+            (Target, target_rows),
+        ):
+            for start in range(0, len(rows), batch_size):
+                await connection.execute(
+                    insert(model.__table__), rows[start : start + batch_size]
+                )
+        await connection.execute(text("ANALYZE cats, missions, targets"))
+
+    return {
+        "cats": len(cat_rows),
+        "missions": len(mission_rows),
+        "targets": len(target_rows),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with test data")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--cats", type=int, default=1000)
+    parser.add_argument("--missions", type=int, default=10000)
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument("--truncate", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    try:
+        if args.truncate:
+            await truncate(engine)
+        counts = await seed(
+            engine, args.cats, args.missions, random_seed=args.random_seed
+        )
+        print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+"""Measures list endpoint serialization throughput.
+
+Builds pages of detached ORM instances and turns them into response bytes the
+way the routes used to (``Schema(**obj.__dict__)`` followed by FastAPI's
+response_model validation and serialization) and the way they do now
+(``Schema.from_instance`` rendered by SchemaResponse). No database is needed.
+
+    python -m benchmarks.serialization --limits 50 500
+"""
+
+import argparse
+import datetime
+import time
+import uuid
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.responses import SchemaResponse
+from app.models.cats import Cat
+from app.models.missions import Mission, Target
+from app.schemas.cats import CatSchema
+from app.schemas.common import PageSchema
+from app.schemas.missions import MissionSchema, TargetSchema
+from benchmarks.seed import BREEDS, COUNTRIES
+
+TARGETS_PER_MISSION = 2
+
+
+def make_cat(index: int) -> Cat:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return Cat(
+        id=uuid.uuid4(),
+        name=f"Cat {index}",
+        breed=BREEDS[index % len(BREEDS)],
+        experience=index % 20 + 1,
+        salary=1000 + index,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def make_mission(index: int) -> Mission:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    mission_id = uuid.uuid4()
+    return Mission(
+        id=mission_id,
+        cat=make_cat(index),
+        is_completed=False,
+        created_at=now,
+        updated_at=now,
+        targets=[
+            Target(
+                id=uuid.uuid4(),
+                mission_id=mission_id,
+                name=f"Target {index}.{number}",
+                country=COUNTRIES[number % len(COUNTRIES)],
+                notes=None,
+                is_completed=False,
+                created_at=now,
+                updated_at=now,
+            )
+            for number in range(TARGETS_PER_MISSION)
+        ],
+    )
+
+
+def legacy_mission(obj: Mission) -> MissionSchema:
+    return MissionSchema(
+        id=obj.id,
+        targets=[TargetSchema(**target.__dict__) for target in obj.targets],
+        cat=CatSchema(**obj.cat.__dict__) if obj.cat else None,
+        is_completed=obj.is_completed,
+        created_at=obj.created_at,
+        updated_at=obj.updated_at,
+    )
+
+
+def legacy_renderer(schema: type, to_schema: Callable[[Any], Any]) -> Callable:
+    field = create_model_field("Response", PageSchema[schema], mode="serialization")
+
+    async def render(rows: list) -> bytes:
+        page = PageSchema[schema](items=[to_schema(row) for row in rows])
+        content = await serialize_response(field=field, response_content=page)
+        return JSONResponse(content).body
+
+    return render
+
+
+def fast_renderer(schema: type) -> Callable:
+    async def render(rows: list) -> bytes:
+        page = PageSchema[schema].model_construct(
+            items=[schema.from_instance(row) for row in rows], next_cursor=None
+        )
+        return SchemaResponse(page).body
+
+    return render
+
+
+def measure(render: Callable, rows: list, duration: float) -> tuple[float, int]:
+    coroutine = render(rows)
+    # serialize_response is a coroutine that never awaits, drive it by hand
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        body = stop.value
+
+    iterations = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        try:
+            render(rows).send(None)
+        except StopIteration:
+            pass
+        iterations += 1
+    elapsed = time.perf_counter() - started
+    return iterations * len(rows) / elapsed, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    endpoints = {
+        "cats": (
+            make_cat,
+            legacy_renderer(CatSchema, lambda cat: CatSchema(**cat.__dict__)),
+            fast_renderer(CatSchema),
+        ),
+        "missions": (
+            make_mission,
+            legacy_renderer(MissionSchema, legacy_mission),
+            fast_renderer(MissionSchema),
+        ),
+    }
+
+    print(f"{'endpoint':>9} {'limit':>6} {'path':>7} {'rows/s':>10} {'bytes':>8}")
+    for name, (factory, legacy, fast) in endpoints.items():
+        for limit in args.limits:
+            rows = [factory(index) for index in range(limit)]
+            for path, render in (("legacy", legacy), ("fast", fast)):
+                throughput, size = measure(render, rows, args.duration)
+                print(f"{name:>9} {limit:>6} {path:>7} {throughput:>10.0f} {size:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""add query indexes
+
+Revision ID: 4f73a0ad3f4b
+Revises: da47efbf7b75
+Create Date: 2026-10-18 14:02:11.412307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f73a0ad3f4b'
+down_revision: Union[str, None] = 'da47efbf7b75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_cats_created_at_id', 'cats', ['created_at', 'id'], None),
+    ('ix_cats_breed_created_at_id', 'cats', ['breed', 'created_at', 'id'], None),
+    ('ix_cats_experience', 'cats', ['experience'], None),
+    ('ix_missions_cat_id', 'missions', ['cat_id'], None),
+    ('ix_missions_created_at_id', 'missions', ['created_at', 'id'], None),
+    ('ix_missions_incomplete_created_at_id', 'missions', ['created_at', 'id'], 'NOT is_completed'),
+    ('ix_targets_mission_id', 'targets', ['mission_id'], None),
+    ('ix_targets_mission_id_incomplete', 'targets', ['mission_id'], 'NOT is_completed'),
+    ('ix_targets_country_mission_id', 'targets', ['country', 'mission_id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
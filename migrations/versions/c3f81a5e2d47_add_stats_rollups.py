@@ -0,0 +1,166 @@
+"""add stats rollups
+
+Revision ID: c3f81a5e2d47
+Revises: b7e2c41d9a30
+Create Date: 2026-10-18 17:31:08.204615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f81a5e2d47'
+down_revision: Union[str, None] = 'b7e2c41d9a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# source table: (rollup table, rollup key, key expression, {column: expression})
+ROLLUPS = {
+    'missions': (
+        'cat_mission_stats',
+        'cat_id',
+        "coalesce(cat_id, '00000000-0000-0000-0000-000000000000'::uuid)",
+        {'missions': '1', 'completed_missions': 'is_completed::int'},
+    ),
+    'targets': (
+        'country_target_stats',
+        'country',
+        'country',
+        {'targets': '1', 'open_targets': '(NOT is_completed)::int'},
+    ),
+    'cats': (
+        'breed_cat_stats',
+        'breed',
+        'breed',
+        {'cats': '1', 'salary_total': 'salary::bigint'},
+    ),
+}
+
+
+def apply_delta(table: str, sources: list[tuple[str, str]]) -> str:
+    """Appends the net change of the given transition tables to the rollup's
+    deltas, one row per key. Writers only ever insert deltas, so they never wait
+    on each other's rollup rows; the application folds the deltas into the
+    rollup periodically and adds the pending ones up on read."""
+    rollup, key, key_expression, columns = ROLLUPS[table]
+    changes = ' UNION ALL '.join(
+        f'SELECT {key_expression} AS key, '
+        + ', '.join(f'{sign}({expression}) AS {column}' for column, expression in columns.items())
+        + f' FROM {source}'
+        for source, sign in sources
+    )
+    return f"""
+        INSERT INTO {rollup}_deltas ({key}, {', '.join(columns)})
+        SELECT key, {', '.join(f'sum({column})' for column in columns)}
+        FROM ({changes}) AS changes
+        GROUP BY key
+        HAVING {' OR '.join(f'sum({column}) <> 0' for column in columns)}
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cat_mission_stats',
+    sa.Column('cat_id', sa.UUID(), nullable=False),
+    sa.Column('missions', sa.Integer(), nullable=False),
+    sa.Column('completed_missions', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('cat_id')
+    )
+    op.create_table('country_target_stats',
+    sa.Column('country', sa.String(), nullable=False),
+    sa.Column('targets', sa.Integer(), nullable=False),
+    sa.Column('open_targets', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('country')
+    )
+    op.create_table('breed_cat_stats',
+    sa.Column('breed', sa.String(), nullable=False),
+    sa.Column('cats', sa.Integer(), nullable=False),
+    sa.Column('salary_total', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('breed')
+    )
+    op.create_table('cat_mission_stats_deltas',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('cat_id', sa.UUID(), nullable=False),
+    sa.Column('missions', sa.Integer(), nullable=False),
+    sa.Column('completed_missions', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('country_target_stats_deltas',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('country', sa.String(), nullable=False),
+    sa.Column('targets', sa.Integer(), nullable=False),
+    sa.Column('open_targets', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('breed_cat_stats_deltas',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('breed', sa.String(), nullable=False),
+    sa.Column('cats', sa.Integer(), nullable=False),
+    sa.Column('salary_total', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    for table, (rollup, key, key_expression, columns) in ROLLUPS.items():
+        op.execute(f"""
+            CREATE FUNCTION {table}_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    {apply_delta(table, [('new_rows', '+')])};
+                ELSIF TG_OP = 'UPDATE' THEN
+                    {apply_delta(table, [('new_rows', '+'), ('old_rows', '-')])};
+                ELSIF TG_OP = 'DELETE' THEN
+                    {apply_delta(table, [('old_rows', '-')])};
+                ELSE
+                    DELETE FROM {rollup};
+                    DELETE FROM {rollup}_deltas;
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        # Transition tables can't be combined with several events in one trigger
+        op.execute(f"""
+            CREATE TRIGGER {table}_rollup_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION {table}_rollup()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_rollup_update AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION {table}_rollup()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_rollup_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION {table}_rollup()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_rollup_truncate AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION {table}_rollup()
+        """)
+        # Creating the triggers locked the table against writes until the end of
+        # the migration, so the backfill can't miss or double count a change
+        op.execute(f"""
+            INSERT INTO {rollup} ({key}, {', '.join(columns)})
+            SELECT {key_expression}, {', '.join(f'sum({expression})' for expression in columns.values())}
+            FROM {table}
+            GROUP BY 1
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(ROLLUPS):
+        for event in ('truncate', 'delete', 'update', 'insert'):
+            op.execute(f'DROP TRIGGER {table}_rollup_{event} ON {table}')
+        op.execute(f'DROP FUNCTION {table}_rollup()')
+    op.drop_table('breed_cat_stats_deltas')
+    op.drop_table('country_target_stats_deltas')
+    op.drop_table('cat_mission_stats_deltas')
+    op.drop_table('breed_cat_stats')
+    op.drop_table('country_target_stats')
+    op.drop_table('cat_mission_stats')
@@ -0,0 +1,59 @@
+"""add unassigned missions indexes
+
+Revision ID: d9a4e6b1c058
+Revises: c3f81a5e2d47
+Create Date: 2026-10-18 19:04:51.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4e6b1c058'
+down_revision: Union[str, None] = 'c3f81a5e2d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_missions_unassigned_created_at_id',
+            'missions',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('cat_id IS NULL AND NOT is_completed'),
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_missions_incomplete_cat_id',
+            'missions',
+            ['cat_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text('NOT is_completed'),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_missions_incomplete_cat_id',
+            table_name='missions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_missions_unassigned_created_at_id',
+            table_name='missions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import DATABASE_URL
+
+
+def database_available() -> bool:
+    async def connect() -> None:
+        engine = create_async_engine(DATABASE_URL, connect_args={"timeout": 5})
+        try:
+            async with engine.connect():
+                pass
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(connect())
+    except (OSError, asyncio.TimeoutError, SQLAlchemyError):
+        return False
+    return True
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    database_items = [item for item in items if "database" in item.keywords]
+    if database_items and not database_available():
+        skip = pytest.mark.skip(reason="the database can't be reached")
+        for item in database_items:
+            item.add_marker(skip)
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from typing import Optional
+
+import pytest
+
+from app.core.cache import (
+    ALL_TAGS,
+    MAX_PAYLOAD_SIZE,
+    InMemoryCacheBackend,
+    InvalidationBroadcast,
+    ResponseCache,
+)
+from app.core.singleflight import SingleFlight
+
+CAT_TAGS = ("cat:1", "cats:list")
+OWN_PID = 100
+
+
+def new_cache(
+    broadcast: Optional[InvalidationBroadcast] = None, replica_lag: float = 0.0
+) -> ResponseCache:
+    return ResponseCache(
+        InMemoryCacheBackend(max_entries=100, ttl=60),
+        single_flight=SingleFlight(),
+        broadcast=broadcast,
+        replica_lag=replica_lag,
+    )
+
+
+class ListenerConnection:
+    """Stands in for the listener's asyncpg connection."""
+
+    def get_server_pid(self) -> int:
+        return OWN_PID
+
+
+def new_broadcast(connected: bool = True) -> InvalidationBroadcast:
+    async def connect():
+        raise AssertionError("the tests don't connect")
+
+    broadcast = InvalidationBroadcast(
+        connect, "cache_invalidations", reconnect_interval=1, max_pending=3
+    )
+    broadcast.connection = ListenerConnection() if connected else None
+    return broadcast
+
+
+async def load(
+    cache: ResponseCache, value: str, replica: bool = False, key: str = "cat:1"
+) -> str:
+    async def loader() -> str:
+        return value
+
+    return await cache.get_or_load(key, loader, lambda _: CAT_TAGS, replica=replica)
+
+
+def test_invalidate_evicts_the_tagged_entries():
+    async def scenario() -> list[Optional[str]]:
+        cache = new_cache()
+        await load(cache, "cat", key="cat:1")
+        await load(cache, "other cat", key="cat:2")
+        await cache.local.set("cat:3", "untagged")
+        await cache.invalidate("cats:list")
+        return [await cache.get(key) for key in ("cat:1", "cat:2", "cat:3")]
+
+    assert asyncio.run(scenario()) == [None, None, "untagged"]
+
+
+def test_value_loaded_before_a_concurrent_invalidation_isnt_stored():
+    async def scenario() -> tuple[str, Optional[str]]:
+        cache = new_cache()
+        loading, invalidated = asyncio.Event(), asyncio.Event()
+
+        async def loader() -> str:
+            loading.set()
+            await invalidated.wait()
+            return "stale"
+
+        reader = asyncio.create_task(
+            cache.get_or_load("cat:1", loader, lambda _: CAT_TAGS)
+        )
+        await loading.wait()
+        await cache.invalidate("cat:1")
+        invalidated.set()
+        return await reader, await cache.get("cat:1")
+
+    assert asyncio.run(scenario()) == ("stale", None)
+
+
+def test_replica_reads_are_cached_apart_from_the_primary():
+    async def scenario() -> list[Optional[str]]:
+        cache = new_cache()
+        await load(cache, "from the replica", replica=True)
+        return [
+            await cache.get("cat:1@replica"),
+            await cache.get("cat:1"),
+            await load(cache, "from the primary"),
+            await load(cache, "reloaded", replica=True),
+        ]
+
+    assert asyncio.run(scenario()) == [
+        "from the replica",
+        None,
+        "from the primary",
+        "from the replica",
+    ]
+
+
+def test_replica_reads_arent_stored_within_the_replica_lag():
+    async def scenario() -> list[Optional[str]]:
+        cache = new_cache(replica_lag=60)
+        await cache.invalidate("cat:1")
+        await load(cache, "maybe stale", replica=True)
+        await load(cache, "fresh")
+        return [await cache.get("cat:1@replica"), await cache.get("cat:1")]
+
+    assert asyncio.run(scenario()) == [None, "fresh"]
+
+
+def test_nothing_is_stored_while_the_broadcast_is_disconnected():
+    async def scenario() -> Optional[str]:
+        cache = new_cache(broadcast=new_broadcast(connected=False))
+        await load(cache, "cat")
+        return await cache.get("cat:1")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_invalidations_are_published_to_the_broadcast():
+    async def scenario() -> set[str]:
+        broadcast = new_broadcast()
+        cache = new_cache(broadcast=broadcast)
+        await cache.invalidate("cat:1", "cats:list")
+        return broadcast._pending
+
+    assert asyncio.run(scenario()) == {"cat:1", "cats:list"}
+
+
+def test_too_many_pending_invalidations_are_published_as_all_tags():
+    broadcast = new_broadcast()
+    broadcast.publish(["cat:1", "cat:2"])
+    broadcast.publish(["cat:3", "cat:4"])
+    assert broadcast._pending == {ALL_TAGS}
+
+
+@pytest.mark.parametrize(
+    "pid, payload, remaining",
+    [
+        (1, json.dumps(["cat:1"]), [None, "other cat"]),
+        (1, json.dumps([ALL_TAGS]), [None, None]),
+        # Applied when they were published
+        (OWN_PID, json.dumps([ALL_TAGS]), ["cat", "other cat"]),
+    ],
+)
+def test_invalidations_from_other_workers_are_applied(
+    pid: int, payload: str, remaining: list[Optional[str]]
+):
+    async def scenario() -> list[Optional[str]]:
+        broadcast = new_broadcast()
+        cache = new_cache(broadcast=broadcast)
+        await load(cache, "cat", key="cat:1")
+        await cache.local.set("cat:2", "other cat", ["cat:2"])
+        broadcast.on_notification(pid, payload)
+        return [await cache.get("cat:1"), await cache.get("cat:2")]
+
+    assert asyncio.run(scenario()) == remaining
+
+
+def test_lost_broadcast_drops_the_local_entries():
+    # Invalidations sent while the listener was down never arrive
+    async def scenario() -> tuple[Optional[str], Optional[str]]:
+        broadcast = new_broadcast()
+        cache = new_cache(broadcast=broadcast)
+        await load(cache, "cat")
+        broadcast.on_closed()
+        dropped = await cache.get("cat:1")
+        await load(cache, "reloaded")
+        return dropped, await cache.get("cat:1")
+
+    assert asyncio.run(scenario()) == (None, "reloaded")
+
+
+def test_broadcast_payloads_fit_in_a_notification():
+    tags = sorted(f"cat:{number:036d}" for number in range(1000))
+    payloads = list(InvalidationBroadcast._payloads(tags))
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= MAX_PAYLOAD_SIZE for payload in payloads)
+    assert [tag for payload in payloads for tag in json.loads(payload)] == tags
@@ -0,0 +1,127 @@
+"""Concurrent PATCH requests on one mission, each in its own session and
+connection: exactly one of them may win, the others get the business-rule
+error."""
+
+import asyncio
+import contextlib
+import uuid
+from collections import Counter
+from typing import AsyncIterator
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import InMemoryCacheBackend, ResponseCache
+from app.core.database import DATABASE_URL
+from app.models.cats import Cat
+from app.models.missions import Mission, Target
+from app.schemas.missions import (
+    MissionCreateSchema,
+    MissionUpdateSchema,
+    TargetCreateSchema,
+)
+from app.services.missions import MissionService
+
+pytestmark = pytest.mark.database
+
+CONCURRENCY = 20
+
+
+def disabled_cache() -> ResponseCache:
+    return ResponseCache(InMemoryCacheBackend(max_entries=1, ttl=0), enabled=False)
+
+
+@contextlib.asynccontextmanager
+async def mission_with_cats() -> (
+    AsyncIterator[tuple[async_sessionmaker, uuid.UUID, list[uuid.UUID]]]
+):
+    engine = create_async_engine(DATABASE_URL, pool_size=CONCURRENCY)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    cats = [
+        Cat(name=f"Racer {number}", breed="Bengal", experience=1, salary=1)
+        for number in range(CONCURRENCY)
+    ]
+    try:
+        async with session_maker() as session:
+            session.add_all(cats)
+            await session.commit()
+            mission = await MissionService(session, disabled_cache()).create_mission(
+                MissionCreateSchema(
+                    targets=[
+                        TargetCreateSchema(name=f"Target {number}", country="X")
+                        for number in range(3)
+                    ]
+                )
+            )
+        yield session_maker, mission.id, [cat.id for cat in cats]
+    finally:
+        async with session_maker() as session:
+            await session.execute(delete(Mission).where(Mission.id == mission.id))
+            await session.execute(
+                delete(Cat).where(Cat.id.in_([cat.id for cat in cats]))
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+async def race(
+    session_maker: async_sessionmaker,
+    mission_id: uuid.UUID,
+    updates: list[MissionUpdateSchema],
+) -> Counter:
+    start = asyncio.Event()
+
+    async def patch(mission_data: MissionUpdateSchema) -> str:
+        async with session_maker() as session:
+            # Open the connection up front so all updates race for the row lock
+            await session.connection()
+            await start.wait()
+            try:
+                await MissionService(session, disabled_cache()).update_mission(
+                    mission_id, mission_data
+                )
+            except HTTPException as exc:
+                return f"{exc.status_code} {exc.detail}"
+            return "200"
+
+    tasks = [asyncio.create_task(patch(mission_data)) for mission_data in updates]
+    await asyncio.sleep(0.1)
+    start.set()
+    return Counter(await asyncio.gather(*tasks))
+
+
+def test_concurrent_cat_assignment():
+    async def scenario() -> Counter:
+        async with mission_with_cats() as (session_maker, mission_id, cat_ids):
+            return await race(
+                session_maker,
+                mission_id,
+                [MissionUpdateSchema(cat_id=cat_id) for cat_id in cat_ids],
+            )
+
+    assert asyncio.run(scenario()) == Counter(
+        {"200": 1, "400 Mission cat already assigned": CONCURRENCY - 1}
+    )
+
+
+def test_concurrent_completion():
+    async def scenario() -> tuple[Counter, list[bool]]:
+        async with mission_with_cats() as (session_maker, mission_id, _):
+            outcomes = await race(
+                session_maker,
+                mission_id,
+                [MissionUpdateSchema(is_completed=True)] * CONCURRENCY,
+            )
+            async with session_maker() as session:
+                targets = await session.scalars(
+                    select(Target.is_completed).where(Target.mission_id == mission_id)
+                )
+                return outcomes, list(targets)
+
+    outcomes, targets_completed = asyncio.run(scenario())
+    assert outcomes == Counter(
+        {"200": 1, "400 Mission already completed": CONCURRENCY - 1}
+    )
+    assert targets_completed == [True] * 3
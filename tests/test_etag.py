@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+import pytest
+
+from app.core.etag import etag_matches, make_etag
+
+CAT_ID = uuid.UUID(int=1)
+UPDATED_AT = datetime(2026, 10, 18, tzinfo=timezone.utc)
+ETAG = make_etag([(CAT_ID, UPDATED_AT)])
+
+
+def test_etag_is_a_quoted_stable_digest():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert make_etag([(CAT_ID, UPDATED_AT)]) == ETAG
+
+
+@pytest.mark.parametrize(
+    "versions",
+    [
+        [(CAT_ID, datetime(2026, 10, 19, tzinfo=timezone.utc))],
+        [(uuid.UUID(int=2), UPDATED_AT)],
+        [(CAT_ID, UPDATED_AT), ("next", True)],
+        [],
+    ],
+)
+def test_etag_changes_with_the_versions(versions: list[tuple]):
+    assert make_etag(versions) != ETAG
+
+
+def test_etag_depends_on_the_order():
+    versions = [(uuid.UUID(int=number), UPDATED_AT) for number in range(2)]
+    assert make_etag(versions) != make_etag(reversed(versions))
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (ETAG, True),
+        (f"W/{ETAG}", True),
+        (f'"other", {ETAG}', True),
+        ("*", True),
+        ('"other"', False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_if_none_match(if_none_match: Optional[str], matches: bool):
+    assert etag_matches(if_none_match, ETAG) is matches
+
+
+def test_missing_resource_never_matches():
+    assert etag_matches("*", None) is False
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core.events import RESYNC_MESSAGE, Subscription, format_event
+
+
+def test_format_event_names_the_event_after_its_type():
+    payload = '{"type": "mission.created", "mission_id": "1"}'
+    assert format_event(payload) == (
+        f"event: mission.created\ndata: {payload}\n\n".encode()
+    )
+    assert format_event("not json") == b"event: message\ndata: not json\n\n"
+
+
+def test_subscription_delivers_queued_events_in_order():
+    async def scenario() -> list[bytes]:
+        subscription = Subscription(max_size=3)
+        subscription.put(b"1")
+        subscription.put(b"2")
+        return await subscription.wait(timeout=1)
+
+    assert asyncio.run(scenario()) == [b"1", b"2"]
+
+
+def test_full_subscription_drops_the_oldest_event_and_resyncs_once():
+    async def scenario() -> tuple[list[bytes], list[bytes]]:
+        subscription = Subscription(max_size=2)
+        for message in (b"1", b"2", b"3"):
+            subscription.put(message)
+        first = await subscription.wait(timeout=1)
+        subscription.put(b"4")
+        return first, await subscription.wait(timeout=1)
+
+    assert asyncio.run(scenario()) == ([RESYNC_MESSAGE, b"2", b"3"], [b"4"])
+
+
+def test_lost_subscription_resyncs_without_events():
+    async def scenario() -> list[bytes]:
+        subscription = Subscription(max_size=2)
+        subscription.lose()
+        return await subscription.wait(timeout=1)
+
+    assert asyncio.run(scenario()) == [RESYNC_MESSAGE]
+
+
+def test_idle_subscription_returns_nothing_after_the_timeout():
+    async def scenario() -> list[bytes]:
+        return await Subscription(max_size=2).wait(timeout=0.01)
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,49 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.imports import iter_records, split_records
+
+
+@pytest.mark.parametrize(
+    "text, quoted, records, remainder",
+    [
+        ("", False, [], ""),
+        ("a\nb\nc", False, ["a", "b"], "c"),
+        ("a\nb\n", False, ["a", "b"], ""),
+        ('{"name": "a\\nb"}\n', False, ['{"name": "a\\nb"}'], ""),
+        ("a,1\nb,2\n", True, ["a,1\n", "b,2\n"], ""),
+        ('"a\nb",1\nc', True, ['"a\nb",1\n'], "c"),
+        ('"a\nb', True, [], '"a\nb'),
+        ('"say ""hi""\n",1\n', True, ['"say ""hi""\n",1\n'], ""),
+    ],
+)
+def test_split_records(text: str, quoted: bool, records: list[str], remainder: str):
+    assert split_records(text, quoted) == (records, remainder)
+
+
+async def chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def collect(body: AsyncIterator[bytes], quoted: bool) -> list[str]:
+    return [
+        record async for records in iter_records(body, quoted) for record in records
+    ]
+
+
+def test_records_are_decoded_across_chunk_boundaries():
+    body = "\ufeffname\nMia\nZoë\nLast".encode()
+    # Splits the BOM and the two bytes of "ë" across chunks
+    parts = [body[:2], body[2:15], body[15:]]
+    records = asyncio.run(collect(chunks(*parts), quoted=True))
+    assert records == ["name\n", "Mia\n", "Zoë\n", "Last"]
+
+
+def test_invalid_utf8_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(collect(chunks(b"name\n\xff\n"), quoted=False))
+    assert exc_info.value.status_code == 400
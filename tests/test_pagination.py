@@ -0,0 +1,32 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2026, 10, 18, 17, 31, 8, 204615, tzinfo=timezone.utc)
+    instance_id = uuid.uuid4()
+    cursor = encode_cursor(created_at, instance_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, instance_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        base64.urlsafe_b64encode(b'["yesterday", "1"]').decode(),
+        base64.urlsafe_b64encode(
+            b'["2026-10-18T17:31:08+00:00", "not a uuid"]'
+        ).decode(),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor: str):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
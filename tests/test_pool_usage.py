@@ -0,0 +1,96 @@
+"""Pool checkouts of requests, read from the Server-Timing header."""
+
+import asyncio
+import contextlib
+import re
+from typing import AsyncIterator
+
+import httpx
+import pytest
+
+from app.config.settings import settings
+from app.core.breeds import StaticBreedSource, breed_registry
+from app.core.cache import response_cache
+from app.main import app
+
+pytestmark = pytest.mark.database
+
+POOL_CHECKOUTS = re.compile(r'pool;dur=[\d.]+;desc="(\d+) checkouts"')
+BREED = "Bengal"
+
+
+def checkouts(response: httpx.Response) -> int:
+    return int(POOL_CHECKOUTS.search(response.headers["Server-Timing"]).group(1))
+
+
+@contextlib.asynccontextmanager
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as test_client:
+            yield test_client
+
+
+@contextlib.asynccontextmanager
+async def new_cat(test_client: httpx.AsyncClient) -> AsyncIterator[str]:
+    response = await test_client.post(
+        "/cats/", json={"name": "Pooled", "breed": BREED, "experience": 1, "salary": 1}
+    )
+    cat_id = response.json()["id"]
+    try:
+        yield cat_id
+    finally:
+        await test_client.delete(f"/cats/{cat_id}")
+
+
+@pytest.fixture(autouse=True)
+def static_breeds(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(breed_registry, "source", StaticBreedSource([BREED]))
+    monkeypatch.setattr(breed_registry, "snapshot_path", None)
+
+
+def test_validation_rejected_requests_check_out_nothing():
+    async def scenario() -> list[httpx.Response]:
+        async with client() as test_client:
+            return [
+                await test_client.post("/cats/", json={"name": "No breed"}),
+                await test_client.get("/missions/batch"),
+            ]
+
+    responses = asyncio.run(scenario())
+    assert [response.status_code for response in responses] == [422, 422]
+    assert [checkouts(response) for response in responses] == [0, 0]
+
+
+@pytest.mark.skipif(not settings.CACHE_ENABLED, reason="the cache is disabled")
+def test_cache_served_request_checks_out_nothing():
+    async def scenario() -> tuple[httpx.Response, httpx.Response]:
+        async with client() as test_client, new_cat(test_client) as cat_id:
+            first = await test_client.get(f"/cats/{cat_id}")
+            return first, await test_client.get(f"/cats/{cat_id}")
+
+    first, cached = asyncio.run(scenario())
+    assert checkouts(first) == 1
+    assert cached.status_code == 200
+    assert checkouts(cached) == 0
+
+
+@pytest.mark.parametrize("path", ["/cats/", "/cats/{cat_id}", "/missions/"])
+def test_stale_etag_probe_releases_its_connection(
+    path: str, monkeypatch: pytest.MonkeyPatch
+):
+    # A probe that kept its connection would serve the response on it too. The
+    # cache is off so that the response is read from the database
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+    async def scenario() -> httpx.Response:
+        async with client() as test_client, new_cat(test_client) as cat_id:
+            return await test_client.get(
+                path.format(cat_id=cat_id),
+                headers={"If-None-Match": '"stale"'},
+            )
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert checkouts(response) == 2
@@ -0,0 +1,251 @@
+"""Plans every statement a service method emits with EXPLAIN (FORMAT JSON).
+
+Sequential scans are disabled while planning, so a Seq Scan left on cats,
+missions or targets means that no index can serve the lookup, whatever the
+size of the tables. Each scenario runs in a transaction that is rolled back.
+"""
+
+import asyncio
+import contextlib
+import json
+from typing import Any, Awaitable, Callable, Iterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from app.core.breeds import BreedRegistry, StaticBreedSource
+from app.core.cache import InMemoryCacheBackend, ResponseCache
+from app.core.database import DATABASE_URL
+from app.models.cats import Cat
+from app.models.missions import Mission, Target
+from app.schemas.cats import CatCreateSchema, CatFilterSchema, CatUpdateSchema
+from app.schemas.missions import (
+    MissionCreateSchema,
+    MissionFilterSchema,
+    MissionUpdateSchema,
+    TargetBatchUpdateItemSchema,
+    TargetCreateSchema,
+    TargetUpdateSchema,
+)
+from app.services.assignment import AssignmentService
+from app.services.cats import CatService
+from app.services.missions import MissionService
+from app.services.stats import StatsService
+
+pytestmark = pytest.mark.database
+
+Scenario = Callable[[AsyncSession, dict[str, Any]], Awaitable[Any]]
+INDEXED_TABLES = {"cats", "missions", "targets"}
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+BREED = "Bengal"
+COUNTRY = "Ukraine"
+# More rows than a page of the samples, so that they have a next cursor
+SAMPLE_ROWS = 6
+
+breed_registry = BreedRegistry(StaticBreedSource([BREED]), ttl=3600)
+cache = ResponseCache(InMemoryCacheBackend(max_entries=1, ttl=0), enabled=False)
+
+
+def cats(session: AsyncSession) -> CatService:
+    return CatService(session, breed_registry, cache)
+
+
+def missions(session: AsyncSession) -> MissionService:
+    return MissionService(session, cache)
+
+
+async def create_and_delete_cat(session: AsyncSession, samples: dict) -> None:
+    cat = await cats(session).create_cat(
+        CatCreateSchema(name="Explain", breed=BREED, experience=1, salary=1)
+    )
+    await cats(session).delete_cat(cat.id)
+
+
+async def create_and_delete_mission(session: AsyncSession, samples: dict) -> None:
+    mission = await missions(session).create_mission(
+        MissionCreateSchema(targets=[TargetCreateSchema(name="T", country="X")])
+    )
+    await missions(session).delete_mission(mission.id)
+
+
+async def create_and_complete_mission(session: AsyncSession, samples: dict) -> None:
+    mission = await missions(session).create_mission(
+        MissionCreateSchema(targets=[TargetCreateSchema(name="T", country="X")])
+    )
+    await missions(session).update_mission(
+        mission.id, MissionUpdateSchema(cat_id=samples["cat_id"])
+    )
+    await missions(session).update_mission(
+        mission.id, MissionUpdateSchema(is_completed=True)
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "get_cats()": lambda s, samples: cats(s).get_cats(CatFilterSchema()),
+    "get_cats(cursor)": lambda s, samples: cats(s).get_cats(
+        CatFilterSchema(cursor=samples["cats_cursor"])
+    ),
+    "get_cats(breed)": lambda s, samples: cats(s).get_cats(
+        CatFilterSchema(breed=BREED)
+    ),
+    "get_cats(min_experience)": lambda s, samples: cats(s).get_cats(
+        CatFilterSchema(min_experience=18)
+    ),
+    "get_cats_etag": lambda s, samples: cats(s).get_cats_etag(CatFilterSchema()),
+    "get_cat": lambda s, samples: cats(s).get_cat(samples["cat_id"]),
+    "get_cat_etag": lambda s, samples: cats(s).get_cat_etag(samples["cat_id"]),
+    "get_cats_by_ids": lambda s, samples: cats(s).get_cats_by_ids([samples["cat_id"]]),
+    "update_cat": lambda s, samples: cats(s).update_cat(
+        samples["cat_id"], CatUpdateSchema(salary=10)
+    ),
+    "create_cat + delete_cat": create_and_delete_cat,
+    "get_missions()": lambda s, samples: missions(s).get_missions(
+        MissionFilterSchema()
+    ),
+    "get_missions(cursor)": lambda s, samples: missions(s).get_missions(
+        MissionFilterSchema(cursor=samples["missions_cursor"])
+    ),
+    "get_missions(is_completed)": lambda s, samples: missions(s).get_missions(
+        MissionFilterSchema(is_completed=False)
+    ),
+    "get_missions(cat_id)": lambda s, samples: missions(s).get_missions(
+        MissionFilterSchema(cat_id=samples["cat_id"])
+    ),
+    "get_missions(country)": lambda s, samples: missions(s).get_missions(
+        MissionFilterSchema(country=COUNTRY)
+    ),
+    "get_missions_etag": lambda s, samples: missions(s).get_missions_etag(
+        MissionFilterSchema()
+    ),
+    "get_mission": lambda s, samples: missions(s).get_mission(samples["mission_id"]),
+    "get_missions_by_ids": lambda s, samples: missions(s).get_missions_by_ids(
+        [samples["mission_id"]]
+    ),
+    "get_mission_etag": lambda s, samples: missions(s).get_mission_etag(
+        samples["mission_id"]
+    ),
+    "update_target": lambda s, samples: missions(s).update_target(
+        samples["target_id"], TargetUpdateSchema(notes="explain")
+    ),
+    "update_targets": lambda s, samples: missions(s).update_targets(
+        [TargetBatchUpdateItemSchema(id=samples["target_id"], notes="explain")]
+    ),
+    "create_mission + update_mission": create_and_complete_mission,
+    "create_mission + delete_mission": create_and_delete_mission,
+    # Only base table lookups are checked, the rollup and delta tables are
+    # always read whole
+    "get_mission_totals": lambda s, samples: StatsService(s).get_mission_totals(),
+    "get_missions_by_cat": lambda s, samples: StatsService(s).get_missions_by_cat(50),
+    "get_targets_by_country": lambda s, samples: StatsService(
+        s
+    ).get_targets_by_country(),
+    "get_cats_by_breed": lambda s, samples: StatsService(s).get_cats_by_breed(),
+    "assign_batch": lambda s, samples: AssignmentService(s, cache).assign_batch(100),
+}
+
+
+@contextlib.contextmanager
+def capture_statements(
+    connection: AsyncConnection,
+) -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    target = connection.sync_connection
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def iter_plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def joined_session(connection: AsyncConnection) -> AsyncSession:
+    # Commits and rollbacks of the services only release savepoints, the outer
+    # transaction is rolled back at the end of the scenario
+    return AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+async def create_samples(connection: AsyncConnection) -> dict[str, Any]:
+    async with joined_session(connection) as session:
+        sample_cats = [
+            Cat(name=f"Explain {number}", breed=BREED, experience=1, salary=1)
+            for number in range(SAMPLE_ROWS)
+        ]
+        sample_missions = [
+            Mission(
+                cat=cat if number % 2 else None,
+                targets=[Target(name=f"Target {number}", country=COUNTRY)],
+            )
+            for number, cat in enumerate(sample_cats)
+        ]
+        session.add_all([*sample_cats, *sample_missions])
+        await session.commit()
+
+        cats_page = await cats(session).get_cats(CatFilterSchema(limit=5))
+        missions_page = await missions(session).get_missions(
+            MissionFilterSchema(limit=5)
+        )
+        return {
+            "cat_id": sample_cats[1].id,
+            "mission_id": sample_missions[1].id,
+            "target_id": sample_missions[1].targets[0].id,
+            "cats_cursor": cats_page.next_cursor,
+            "missions_cursor": missions_page.next_cursor,
+        }
+
+
+async def seq_scans(
+    connection: AsyncConnection, statements: list[tuple[str, Any]]
+) -> list[str]:
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    problems = []
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            continue
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        problems.extend(
+            f"Seq Scan on {node['Relation Name']} in: {' '.join(statement.split())}"
+            for node in iter_plan_nodes(plan[0]["Plan"])
+            if node["Node Type"] == "Seq Scan"
+            and node.get("Relation Name") in INDEXED_TABLES
+        )
+    return problems
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_no_seq_scan_on_indexed_tables(name: str):
+    async def scenario() -> tuple[list[tuple[str, Any]], list[str]]:
+        engine = create_async_engine(DATABASE_URL)
+        try:
+            async with engine.connect() as connection:
+                async with connection.begin() as transaction:
+                    samples = await create_samples(connection)
+                    with capture_statements(connection) as statements:
+                        async with joined_session(connection) as session:
+                            await SCENARIOS[name](session, samples)
+                    problems = await seq_scans(connection, statements)
+                    await transaction.rollback()
+                    return statements, problems
+        finally:
+            await engine.dispose()
+
+    statements, problems = asyncio.run(scenario())
+    assert statements
+    assert problems == []
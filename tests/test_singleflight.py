@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class Loader:
+    """Counts its calls and blocks every load until released."""
+
+    def __init__(self, result: str = "loaded"):
+        self.result = result
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        call = self.calls
+        self.started.set()
+        await self.release.wait()
+        return f"{self.result} {call}"
+
+    async def wait_for_calls(self, calls: int) -> None:
+        async def called() -> None:
+            while self.calls < calls:
+                await asyncio.sleep(0)
+
+        await asyncio.wait_for(called(), timeout=1)
+
+
+def test_concurrent_callers_share_one_load():
+    async def scenario() -> tuple[list[str], int]:
+        flight, loader = SingleFlight(), Loader()
+        callers = [asyncio.create_task(flight.do("cats:1", loader)) for _ in range(5)]
+        await loader.started.wait()
+        loader.release.set()
+        return await asyncio.gather(*callers), loader.calls
+
+    results, calls = asyncio.run(scenario())
+    assert results == ["loaded 1"] * 5
+    assert calls == 1
+
+
+def test_finished_load_is_shared_within_the_window():
+    async def scenario() -> list[str]:
+        flight, loader = SingleFlight(window=60), Loader()
+        loader.release.set()
+        return [await flight.do("cats:1", loader), await flight.do("cats:1", loader)]
+
+    assert asyncio.run(scenario()) == ["loaded 1", "loaded 1"]
+
+
+def test_finished_load_is_forgotten_without_a_window():
+    async def scenario() -> tuple[list[str], int]:
+        flight, loader = SingleFlight(), Loader()
+        loader.release.set()
+        results = [await flight.do("cats:1", loader), await flight.do("cats:1", loader)]
+        return results, len(flight)
+
+    assert asyncio.run(scenario()) == (["loaded 1", "loaded 2"], 0)
+
+
+def test_cancelled_leader_lets_the_waiting_callers_load_again():
+    async def scenario() -> tuple[bool, str, int]:
+        flight, loader = SingleFlight(), Loader()
+        leader = asyncio.create_task(flight.do("cats:1", loader))
+        await loader.started.wait()
+        follower = asyncio.create_task(flight.do("cats:1", loader))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+        # The follower starts a load of its own, which can then finish
+        await loader.wait_for_calls(2)
+        loader.release.set()
+        return leader.cancelled(), await follower, loader.calls
+
+    assert asyncio.run(scenario()) == (True, "loaded 2", 2)
+
+
+def test_cancelled_follower_doesnt_cancel_the_load():
+    async def scenario() -> tuple[bool, str, int]:
+        flight, loader = SingleFlight(), Loader()
+        leader = asyncio.create_task(flight.do("cats:1", loader))
+        await loader.started.wait()
+        follower = asyncio.create_task(flight.do("cats:1", loader))
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        await asyncio.gather(follower, return_exceptions=True)
+        loader.release.set()
+        return follower.cancelled(), await leader, loader.calls
+
+    assert asyncio.run(scenario()) == (True, "loaded 1", 1)
+
+
+def test_failed_load_is_raised_to_every_caller_and_forgotten():
+    async def scenario() -> tuple[list, int]:
+        flight = SingleFlight(window=60)
+
+        async def failing_loader() -> str:
+            await asyncio.sleep(0)
+            raise RuntimeError("database is down")
+
+        callers = [
+            asyncio.create_task(flight.do("cats:1", failing_loader)) for _ in range(3)
+        ]
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        return results, len(flight)
+
+    results, flights = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["database is down"] * 3
+    assert flights == 0
+
+
+@pytest.mark.parametrize(
+    "tags, forgotten",
+    [
+        (["cat:1"], True),
+        (["cats:list"], True),
+        (["cat:2"], False),
+    ],
+)
+def test_forget_drops_finished_flights_by_tag(tags: list[str], forgotten: bool):
+    async def scenario() -> str:
+        flight, loader = SingleFlight(window=60), Loader()
+        loader.release.set()
+        await flight.do("cats:1", loader, tags=lambda value: ["cat:1", "cats:list"])
+        flight.forget(tags)
+        return await flight.do("cats:1", loader)
+
+    assert asyncio.run(scenario()) == ("loaded 2" if forgotten else "loaded 1")
+
+
+def test_forget_drops_unfinished_flights():
+    # Their tags aren't known yet, so any invalidation may concern them
+    async def scenario() -> tuple[str, str]:
+        flight, loader = SingleFlight(window=60), Loader()
+        first = asyncio.create_task(flight.do("cats:1", loader))
+        await loader.started.wait()
+        flight.forget(["cat:2"])
+        second = asyncio.create_task(flight.do("cats:1", loader))
+        await loader.wait_for_calls(2)
+        loader.release.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == ("loaded 1", "loaded 2")